@@ -1,9 +1,17 @@
 from typing import Any, Callable, Set, Tuple, List
 import random
+import multiprocessing
+import queue
+import traceback
+import numpy as np
 from miscellaneous.recombination import line_recombination
+from miscellaneous.miscellaneous import FitnessCache
+from miscellaneous.population import MatrixPopulation
+from miscellaneous.parallel import PoolEvaluator, make_evaluator
+from miscellaneous.selection import elitist_selection
+from concurrent.futures import FIRST_COMPLETED, wait
 
-if __name__ == "__main__":
-    Vector = Set[Any]
+Vector = Set[Any]
 
 def genetic_algorithm(population_size:int,
                       random_el:Callable,
@@ -15,7 +23,13 @@ def genetic_algorithm(population_size:int,
                       mutate:Callable,
                       crossover:Callable,
                       P:Vector = None,
-        
+                      cache_size:int = None,
+                      evaluation:str = "serial",
+                      max_workers:int = None,
+                      chunksize:int = 1,
+                      return_population:bool = False,
+                      batched:bool = False,
+                      mating_pool:Callable = None
 )->Any:
     
     """
@@ -32,9 +46,22 @@ def genetic_algorithm(population_size:int,
     - mutate (Callable): A function to perform mutation on an individual.
     - crossover (Callable): A function to perform crossover between two individuals.
     - P (Vector, optional): The initial population (default is None).
+    - cache_size (int, optional): If given, memoize fitness in a FitnessCache of this size (default is None).
+    - evaluation (str, optional): "serial", or "process" to assess the population on a process pool (default is "serial").
+    - max_workers (int, optional): The number of worker processes of the "process" backend (default is the number of CPUs).
+    - chunksize (int, optional): The number of individuals sent to a worker in one task (default is 1).
+    - return_population (bool, optional): Whether to also return the final population (default is False).
+    - batched (bool, optional): Whether to run on a MatrixPopulation with batch operators (default is False).
+      In batched mode P is a MatrixPopulation (or a 2-D array), assess_fitness maps the genome matrix to a
+      fitness array, select_with_replacement maps (fitness array, k) to k indices, crossover maps two parent
+      matrices to two child matrices and mutate maps a genome matrix to a genome matrix; fitness,
+      cache_size and evaluation are not used.
+    - mating_pool (Callable, optional): A batch selection mapping (fitness array, k) to k indices, such as
+      batch_stochastic_universal_sampling; if given, the whole mating pool of a generation is drawn with one
+      call instead of calling select_with_replacement once per parent (default is None).
 
     Returns:
-    Any: The best individual found by the genetic algorithm.
+    Any: The best individual found by the genetic algorithm, or the (best, population) pair if return_population is True.
 
     Example:
     
@@ -50,24 +77,64 @@ def genetic_algorithm(population_size:int,
     
     """
 
-    best = None
-    if P == None:
-        for _ in range(1, population_size): P.append(random_el())
-    while not isIdeal(best) and time >0:
-        fitted_P = assess_fitness(P)
-        if best == None: best = P[0]
-        for i in fitted_P:
-            if i[1] > fitness(best): best = i[0]
-        Q = list()
-        for _ in range(1,(population_size//2)):
-            p_a = select_with_replacement(P)
-            p_b = select_with_replacement(P)
-            c_a, c_b = crossover(p_a,p_b)
-            Q.append(mutate(c_a))
-            Q.append(mutate(c_b))
-        P = Q
+    if batched:
+        return _batched_genetic_algorithm(population_size, random_el, time, assess_fitness, isIdeal,
+                                          select_with_replacement, mutate, crossover, P, return_population)
+    if cache_size is not None and not isinstance(fitness, FitnessCache): fitness = FitnessCache(fitness, cache_size)
+    evaluator = make_evaluator(evaluation, fitness, max_workers, chunksize)
+    if evaluator: assess_fitness = evaluator
+    try:
+        best = None
+        best_fit = None
+        if P == None: P = [random_el() for _ in range(population_size)]
+        while not isIdeal(best) and time >0:
+            fitted_P = assess_fitness(P)
+            for i in fitted_P:
+                if best is None or i[1] > best_fit: best, best_fit = i
+            Q = list()
+            pairs = len(range(1,(population_size//2)))
+            if mating_pool:
+                pool = mating_pool(np.array([f for _, f in fitted_P], dtype=float), 2*pairs)
+                parents = iter([P[i] for i in pool])
+            for _ in range(pairs):
+                p_a = next(parents) if mating_pool else select_with_replacement(P)
+                p_b = next(parents) if mating_pool else select_with_replacement(P)
+                c_a, c_b = crossover(p_a,p_b)
+                Q.append(mutate(c_a))
+                Q.append(mutate(c_b))
+            P = Q
+            time -= 1
+    finally:
+        if evaluator: evaluator.shutdown()
+    return (best, P) if return_population else best
+
+
+def _batched_genetic_algorithm(population_size:int,
+                               random_el:Callable,
+                               time:int,
+                               assess_fitness:Callable,
+                               isIdeal:Callable,
+                               select_with_replacement:Callable,
+                               mutate:Callable,
+                               crossover:Callable,
+                               P:MatrixPopulation = None,
+                               return_population:bool = False
+)-> Any:
+    if P is None: P = MatrixPopulation.from_individuals([random_el() for _ in range(population_size)])
+    elif not isinstance(P, MatrixPopulation): P = MatrixPopulation(P)
+    best:Any = None
+    best_fit = -np.inf
+    while not isIdeal(best) and time > 0:
+        P.evaluate(assess_fitness)
+        genome, fit = P.best()
+        if best is None or fit > best_fit: best, best_fit = genome, fit
+        pairs = (len(P) + 1) // 2
+        p_a = select_with_replacement(P.fitness, pairs)
+        p_b = select_with_replacement(P.fitness, pairs)
+        c_a, c_b = crossover(P.take(p_a), P.take(p_b))
+        P = MatrixPopulation(mutate(np.concatenate((c_a, c_b))[:len(P)]))
         time -= 1
-    return best
+    return (best, P) if return_population else best
 
 
 def genetic_algorithm_with_elitism(population_size:int,
@@ -79,7 +146,13 @@ def genetic_algorithm_with_elitism(population_size:int,
                                    time:int,
                                    select_with_replacement:Callable,
                                    crossover:Callable,
-                                   mutate:Callable
+                                   mutate:Callable,
+                                   cache_size:int = None,
+                                   evaluation:str = "serial",
+                                   max_workers:int = None,
+                                   chunksize:int = 1,
+                                   P:Vector = None,
+                                   return_population:bool = False
 )-> Any:
     
     """
@@ -96,9 +169,15 @@ def genetic_algorithm_with_elitism(population_size:int,
     - select_with_replacement: A function for selecting individuals with replacement.
     - crossover: A function for crossover operation.
     - mutate: A function for mutation operation.
+    - cache_size: If given, memoize fitness in a FitnessCache of this size (default is None).
+    - evaluation: "serial", or "process" to assess the population on a process pool (default is "serial").
+    - max_workers: The number of worker processes of the "process" backend (default is the number of CPUs).
+    - chunksize: The number of individuals sent to a worker in one task (default is 1).
+    - P: The initial population (default is None).
+    - return_population: Whether to also return the final population (default is False).
 
     Returns:
-    Any: The best individual found by the genetic algorithm with elitism.
+    Any: The best individual found by the genetic algorithm with elitism, or the (best, population) pair if return_population is True.
 
     Example:
         best_individual = genetic_algorithm_with_elitism(100, 10, generate_random_individual,
@@ -108,26 +187,158 @@ def genetic_algorithm_with_elitism(population_size:int,
         print(best_individual)
     """
 
-    P:Vector = None
+    if cache_size is not None and not isinstance(fitness, FitnessCache): fitness = FitnessCache(fitness, cache_size)
+    evaluator = make_evaluator(evaluation, fitness, max_workers, chunksize)
+    if evaluator: assess_fitness = evaluator
+    try:
+        best:Any = None
+        best_fit = None
+        if P == None: P = [random_el() for _ in range(population_size)]
+        while not isIdeal(best) and time>0:
+            elites = elitist_selection(assess_fitness(P), max(n, 1))
+            if best is None or elites[0][1] > best_fit: best, best_fit = elites[0]
+            Q = [i[0] for i in elites[:n]]
+            for _ in range((population_size-n)//2):
+                p_a = select_with_replacement(P)
+                p_b = select_with_replacement(P)
+                c_a, c_b = crossover(p_a,p_b)
+                Q.append(mutate(c_a))
+                Q.append(mutate(c_b))
+            P = Q
+            time -= 1
+    finally:
+        if evaluator: evaluator.shutdown()
+    return (best, P) if return_population else best
+
+
+def island_model_genetic_algorithm(islands:int,
+                                   epochs:int,
+                                   K:int,
+                                   migrants:int,
+                                   fitness:Callable,
+                                   engine_args:dict,
+                                   engine:Callable = genetic_algorithm,
+                                   topology:str | Callable = "ring"
+)-> Any:
+
+    """
+    Perform an island-model genetic algorithm.
+
+    Every island evolves its own population in a separate process by running `engine` for K
+    generations at a time. Between two epochs each island sends its top `migrants` individuals to the
+    coordinator, which routes them along the topology; the incoming migrants replace the worst
+    individuals of the receiving island. Only migrants and the final best individuals cross process
+    boundaries.
+
+    Parameters:
+    - islands: The number of islands (processes).
+    - epochs: The number of epochs; each epoch runs K generations on every island.
+    - K: The number of generations between two migrations.
+    - migrants: The number of individuals each island sends at every migration.
+    - fitness: A function to calculate the fitness value for an individual.
+    - engine_args: The keyword arguments of the engine, except P, time, fitness and return_population.
+    - engine: genetic_algorithm or genetic_algorithm_with_elitism (default is genetic_algorithm).
+    - topology: "ring", "fully_connected", "random", or a function mapping (index, islands) to the list
+      of source islands (default is "ring").
+
+    Returns:
+    Any: The best individual found on any island.
+
+    Example:
+        best_individual = island_model_genetic_algorithm(8, 20, 5, 3, calculate_fitness,
+                                                         dict(population_size=100,
+                                                              random_el=generate_random_individual,
+                                                              assess_fitness=assess_fitness_function,
+                                                              isIdeal=is_ideal_function,
+                                                              select_with_replacement=select_with_replacement_function,
+                                                              mutate=mutate_function,
+                                                              crossover=crossover_function),
+                                                         topology="ring")
+        print(best_individual)
+    """
+
+    context = multiprocessing.get_context()
+    outbox = context.Queue()
+    inboxes = [context.Queue() for _ in range(islands)]
+    processes = [context.Process(target=_island,
+                                 args=(i, engine, engine_args, fitness, epochs, K, migrants, inboxes[i], outbox))
+                 for i in range(islands)]
+    try:
+        for process in processes: process.start()
+        for _ in range(epochs - 1):
+            emigrants = _collect(outbox, processes)
+            for i, inbox in enumerate(inboxes):
+                inbox.put([m for j in _migration_sources(topology, i, islands) for m in emigrants[j]])
+        results = _collect(outbox, processes)
+    finally:
+        for process in processes:
+            if process.is_alive() and process.exitcode is None: process.terminate()
+        for process in processes:
+            if process.pid is not None: process.join()
     best:Any = None
-    for _ in population_size: P.append(random_el)
-    while not isIdeal(best) and time>0:
-        fitted_P = sorted(assess_fitness(P),key = lambda x: x[1])
-        for i in fitted_P:
-            if not best or i[1] > fitness(best): best = i[0]
-        Q = [i[0] for i in fitted_P[:n]]
-        P = fitted_P[n:]
-        for _ in range(int(population_size-n)/2):
-            p_a = select_with_replacement(P)
-            p_b = select_with_replacement(P)
-            c_a, c_b = crossover(p_a,p_b)
-            Q.append(mutate(c_a))
-            Q.append(mutate(c_b))
-        P = Q
-        time -= 1
+    for i in range(islands):
+        if results[i] is not None and (best is None or fitness(results[i]) > fitness(best)): best = results[i]
     return best
 
 
+def _collect(outbox:Any,
+             processes:List[Any]
+)-> dict:
+    """Gather one message per island, raising if an island failed or died instead of waiting forever."""
+    messages = {}
+    while len(messages) < len(processes):
+        try: index, payload, error = outbox.get(timeout=0.1)
+        except queue.Empty:
+            for i, process in enumerate(processes):
+                if i not in messages and process.exitcode not in (None, 0):
+                    raise RuntimeError(f"Island {i} exited with code {process.exitcode}")
+            continue
+        if error is not None: raise RuntimeError(f"Island {index} failed:\n{error}")
+        messages[index] = payload
+    return messages
+
+def _migration_sources(topology:str | Callable,
+                       index:int,
+                       islands:int
+)-> List[int]:
+    if callable(topology): return list(topology(index, islands))
+    if islands == 1: return []
+    if topology == "ring": return [(index - 1) % islands]
+    if topology == "fully_connected": return [j for j in range(islands) if j != index]
+    if topology == "random": return [random.choice([j for j in range(islands) if j != index])]
+    raise ValueError(f"Unknown migration topology: {topology!r}")
+
+
+def _island(index:int,
+            engine:Callable,
+            engine_args:dict,
+            fitness:Callable,
+            epochs:int,
+            K:int,
+            migrants:int,
+            inbox:Any,
+            outbox:Any):
+    try:
+        random.seed()
+        P = [engine_args["random_el"]() for _ in range(engine_args["population_size"])]
+        best:Any = None
+        best_fit:Any = None
+        for epoch in range(epochs):
+            epoch_best, P = engine(P=P, time=K, fitness=fitness, return_population=True, **engine_args)
+            if epoch_best is not None:
+                epoch_fit = fitness(epoch_best)
+                if best is None or epoch_fit > best_fit: best, best_fit = epoch_best, epoch_fit
+            if epoch == epochs - 1: break
+            fits = [fitness(p) for p in P]
+            ranking = sorted(range(len(P)), key=fits.__getitem__, reverse=True)
+            outbox.put((index, [P[i] for i in ranking[:migrants]], None))
+            incoming = inbox.get()
+            if incoming: P = [P[i] for i in ranking[:max(len(P) - len(incoming), 0)]] + incoming
+        outbox.put((index, best, None))
+    except BaseException:
+        outbox.put((index, None, traceback.format_exc()))
+
+
 def steady_state_genetic_algorithm(population_size:int,
                                    time:int,
                                    assess_fitness:Callable,
@@ -137,7 +348,8 @@ def steady_state_genetic_algorithm(population_size:int,
                                    crossover:Callable,
                                    mutate:Callable,
                                    isIdeal:Callable,
-                                   select_for_death:Callable
+                                   select_for_death:Callable,
+                                   cache_size:int = None
 )-> Any:
     
     """
@@ -154,6 +366,7 @@ def steady_state_genetic_algorithm(population_size:int,
     - mutate: A function for mutation operation.
     - isIdeal: A function to check if an individual is ideal.
     - select_for_death: A function for selecting individuals for removal.
+    - cache_size: If given, memoize fitness in a FitnessCache of this size (default is None).
 
     Returns:
     Any: The best individual found by the steady-state genetic algorithm.
@@ -166,9 +379,9 @@ def steady_state_genetic_algorithm(population_size:int,
         print(best_individual)
     """
 
-    P:Vector = None
+    if cache_size is not None and not isinstance(fitness, FitnessCache): fitness = FitnessCache(fitness, cache_size)
+    P:Vector = [random_el() for _ in range(population_size)]
     best:Any = None
-    for _ in population_size: P.append(random_el)
     fitted_P = sorted(assess_fitness(P), key = lambda x:x[1])
     for i in fitted_P:
         if not best or i[1] > fitness(best):best = i[0]
@@ -180,17 +393,91 @@ def steady_state_genetic_algorithm(population_size:int,
         c_b = mutate(c_b)
         if fitness(c_a) > fitness(best): best = c_a
         if fitness(c_b) > fitness(best): best = c_b
-        p_d = select_for_death(P)
-        p_e = select_for_death(P)
-        P.remove(p_d)
-        P.remove(p_e)
-        P.add(c_a)
-        P.add(c_b)
+        P.remove(select_for_death(P))
+        P.remove(select_for_death(P))
+        P.append(c_a)
+        P.append(c_b)
 
         time -= 1
     return best
 
 
+def asynchronous_steady_state_genetic_algorithm(population_size:int,
+                                                time:int,
+                                                fitness:Callable,
+                                                random_el:Callable,
+                                                select_with_replacement:Callable,
+                                                crossover:Callable,
+                                                mutate:Callable,
+                                                isIdeal:Callable,
+                                                select_for_death:Callable,
+                                                max_workers:int = None,
+                                                P:Vector = None
+)-> Any:
+
+    """
+    Perform an asynchronous steady-state genetic algorithm.
+
+    Offspring are submitted to a process pool as soon as a worker is free, and each child is inserted
+    into the population (replacing the individual chosen by select_for_death) as soon as its fitness
+    is known, so long evaluations never leave the other workers idle.
+
+    Parameters:
+    - population_size: The size of the population.
+    - time: The maximum number of crossovers (each one produces two children).
+    - fitness: A picklable function to calculate the fitness value for an individual.
+    - random_el: A function to generate a random individual.
+    - select_with_replacement: A function for selecting individuals with replacement.
+    - crossover: A function for crossover operation.
+    - mutate: A function for mutation operation.
+    - isIdeal: A function to check if an individual is ideal.
+    - select_for_death: A function for selecting individuals for removal.
+    - max_workers: The number of worker processes (default is the number of CPUs).
+    - P: The initial population (default is None).
+
+    Returns:
+    Any: The best individual found by the asynchronous steady-state genetic algorithm.
+
+    Example:
+        best_individual = asynchronous_steady_state_genetic_algorithm(100, 50, calculate_fitness,
+                                                                      generate_random_individual,
+                                                                      select_with_replacement_function,
+                                                                      crossover_function, mutate_function,
+                                                                      is_ideal_function, select_for_death_function,
+                                                                      max_workers=32)
+        print(best_individual)
+    """
+
+    evaluator = PoolEvaluator(fitness, max_workers)
+    try:
+        if P is None: P = [random_el() for _ in range(population_size)]
+        P = list(P)
+        best:Any = None
+        best_fit:Any = None
+        for p, f in zip(P, evaluator.map(P)):
+            if best is None or f > best_fit: best, best_fit = p, f
+        pending = dict()
+        children = list()
+        while not isIdeal(best) and (time > 0 or children or pending):
+            while (time > 0 or children) and len(pending) < evaluator.workers:
+                if not children:
+                    c_a, c_b = crossover(select_with_replacement(P), select_with_replacement(P))
+                    children = [mutate(c_a), mutate(c_b)]
+                    time -= 1
+                c = children.pop()
+                pending[evaluator.submit(c)] = c
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                c = pending.pop(future)
+                f = future.result()
+                if f > best_fit: best, best_fit = c, f
+                P.remove(select_for_death(P))
+                P.append(c)
+    finally:
+        evaluator.shutdown(cancel=True)
+    return best
+
+
 def tree_style_genetic_algorithm(population_size:int,
                                  time:int,
                                  r:float,
@@ -199,7 +486,10 @@ def tree_style_genetic_algorithm(population_size:int,
                                  fitness:Callable,
                                  select_with_replacement:Callable,
                                  crossover:Callable,
-                                 isIdeal:Callable
+                                 isIdeal:Callable,
+                                 evaluation:str = "serial",
+                                 max_workers:int = None,
+                                 chunksize:int = 1
 )-> Any:
     
     """
@@ -215,6 +505,9 @@ def tree_style_genetic_algorithm(population_size:int,
     - select_with_replacement: A function for selecting individuals with replacement.
     - crossover: A function for crossover operation.
     - isIdeal: A function to check if an individual is ideal.
+    - evaluation: "serial", or "process" to assess the population on a process pool (default is "serial").
+    - max_workers: The number of worker processes of the "process" backend (default is the number of CPUs).
+    - chunksize: The number of individuals sent to a worker in one task (default is 1).
 
     Returns:
     Any: The best individual found by the tree-style genetic algorithm.
@@ -227,27 +520,31 @@ def tree_style_genetic_algorithm(population_size:int,
         print(best_individual)
     """
 
-    P:Vector = None
-    best:Any = None
-    for _ in range(population_size): P.append(random_el())
-    fitted_P = sorted(assess_fitness(P), key = lambda x :x[1])
-    
-    while not isIdeal(best) and time > 0:
-        for i in fitted_P:
-            if not best or i[1] > fitness(best):best = i[0]
-        Q = List()
-        while len(Q) < population_size:
-            if r >= random.random():
-                p_i = select_with_replacement(P)
-                Q.append(p_i)
-            else:
-                p_a = select_with_replacement(P)
-                p_b = select_with_replacement(P)
-                c_a, c_b = crossover(p_a, p_b)
-                Q.append(c_a)
-                if len(Q) < population_size: Q.append(c_b)
-        P = Q
-        time -= 1
+    evaluator = make_evaluator(evaluation, fitness, max_workers, chunksize)
+    if evaluator: assess_fitness = evaluator
+    try:
+        P:Vector = [random_el() for _ in range(population_size)]
+        best:Any = None
+        best_fit = None
+
+        while not isIdeal(best) and time > 0:
+            top = max(assess_fitness(P), key = lambda x :x[1])
+            if best is None or top[1] > best_fit: best, best_fit = top
+            Q = list()
+            while len(Q) < population_size:
+                if r >= random.random():
+                    p_i = select_with_replacement(P)
+                    Q.append(p_i)
+                else:
+                    p_a = select_with_replacement(P)
+                    p_b = select_with_replacement(P)
+                    c_a, c_b = crossover(p_a, p_b)
+                    Q.append(c_a)
+                    if len(Q) < population_size: Q.append(c_b)
+            P = Q
+            time -= 1
+    finally:
+        if evaluator: evaluator.shutdown()
     return best
 
 
@@ -264,7 +561,7 @@ def scatter_search_with_path_relinking(seeds:Vector,
                                        mutate:Callable,
                                        different_element:Callable,
                                        isIdeal:Callable,
-                                       crossover:Callable = line_recombination()
+                                       crossover:Callable = line_recombination
 
 )->Any:
     
@@ -337,8 +634,8 @@ def differential_evolution(alpha:float,
                            crossover:Callable,
                            sum:Callable,
                            dif:Callable,
-                           mul:Callable
-        
+                           mul:Callable,
+                           cache_size:int = None
 )-> Any:
     
     """
@@ -359,6 +656,7 @@ def differential_evolution(alpha:float,
     - different_element: A function to generate a different element.
     - isIdeal: A function to check if a solution is ideal.
     - crossover: The crossover function.
+    - cache_size: If given, memoize fitness in a FitnessCache of this size (default is None).
 
     Returns:
     Any: The best solution found by the scatter search with path relinking.
@@ -371,24 +669,19 @@ def differential_evolution(alpha:float,
         print(best_solution)
     """
 
-    P:Vector = None
+    if cache_size is not None and not isinstance(fitness, FitnessCache): fitness = FitnessCache(fitness, cache_size)
+    P:Vector = [random_el() for _ in range(population_size)]
     Q:Any = None
     best:Any = None
-    for _ in range(population_size): P.append(random_el())
     while not isIdeal(best) and time > 0:
         for i,p in enumerate(P):
-            if Q and fitness(Q[i]) > fitness(p): p = Q[i]
-            if not best or fitness(p) > fitness(best): best = P
-        Q = P
+            if Q and fitness(Q[i]) > fitness(p): P[i] = p = Q[i]
+            if best is None or fitness(p) > fitness(best): best = p
+        Q = list(P)
         for i, q in enumerate(Q):
-            list = [j  if j != i else None for j in range(len(Q) -1)]
-            a = Q[index_a := list[random.randrange(0,len(list) - 1)]]
-            list.pop(index_a)
-            b = Q[index_b := list[random.randrange(0,len(list) - 1)]]
-            list.pop(index_b)
-            c = Q[list[random.randrange(0,len(list) - 1)]]
+            a, b, c = (Q[j] for j in random.sample([j for j in range(len(Q)) if j != i], 3))
             d = sum(a, mul(alpha, dif(b, c)))
-            p = crossover(d, q)[0]
+            P[i] = crossover(d, q)[0]
         time -= 1
     return best
 
@@ -1,8 +1,8 @@
 from typing import Any, Callable, Set, Tuple, List
 import random
+import numpy as np
 
-if __name__ == "__main__":
-    Vector = Set[Any]
+Vector = Set[Any]
 
 
 def one_point_crossover(v:Vector,
@@ -31,7 +31,9 @@ def one_point_crossover(v:Vector,
     
     """
 
-    return v[:c] + w[c:], w[:c] + v[c:]
+    if not isinstance(v, np.ndarray): return _sliced_crossover(v, w, [c])
+    C, D = batch_one_point_crossover(v[None], w[None], c)
+    return C[0], D[0]
 
 def n_points_crossover(v:Vector,
                        w:Vector,
@@ -60,16 +62,14 @@ def n_points_crossover(v:Vector,
     
     """
     
-    if len(l) == 1:
-        return one_point_crossover(v,w,l[0])
-    else:
-        i,j = n_points_crossover(w[l[0]:],v[l[0]:],l[1:])
-        return v[:l[0]] + i, w[:l[0]] + j
+    if not isinstance(v, np.ndarray): return _sliced_crossover(v, w, l)
+    C, D = batch_n_points_crossover(v[None], w[None], [l])
+    return C[0], D[0]
 
 def random_crossover(v:Vector,
                      w:Vector,
                      p:int = None,
-                     distr:Callable = random.random()
+                     distr:Callable = None
 )-> Tuple[Vector,Vector]:
     
     """
@@ -79,10 +79,10 @@ def random_crossover(v:Vector,
     - v (Vector): The first vector.
     - w (Vector): The second vector.
     - p (float, optional): The probability of crossover for each element (default is 1/len(v)).
-    - distr (Callable, optional): A function that generates random values between 0 and 1 (default is random.random).
+    - distr (Callable, optional): A function that generates random values between 0 and 1 (default is a NumPy generator).
 
     Returns:
-    Tuple[Vector, Vector]: Two vectors after crossover.
+    Tuple[Vector, Vector]: The two vectors, swapped in place where the crossover happened.
 
     Example:
     
@@ -95,9 +95,9 @@ def random_crossover(v:Vector,
     """
 
     p = p if p is not None else 1/len(v)
-    for i in range(len(v)):
-        if p >distr():
-            v[i],w[i] = w[i],v[i]
+    mask = None if distr is None else np.fromiter((p > distr() for _ in range(len(v))), dtype=bool, count=len(v))
+    C, D = batch_random_crossover(_as_row(v)[None], _as_row(w)[None], p, None if mask is None else mask[None])
+    v[:], w[:] = C[0], D[0]
     return v,w
 
 
@@ -157,3 +157,118 @@ def uniform_crossover(probability:float,
     return to_Ret
 
 
+def batch_one_point_crossover(V:np.ndarray,
+                              W:np.ndarray,
+                              c:int | np.ndarray = None,
+                              rng:np.random.Generator = None
+)-> Tuple[np.ndarray, np.ndarray]:
+
+    """
+    Perform one-point crossover between every pair of rows of two parent matrices.
+
+    Parameters:
+    - V (np.ndarray): The (pairs x genome length) matrix of first parents.
+    - W (np.ndarray): The (pairs x genome length) matrix of second parents.
+    - c (int or np.ndarray, optional): The crossover point, shared or one per pair (default is one random point per pair).
+    - rng (np.random.Generator, optional): The random generator used to draw missing points (default is a new generator).
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: The two child matrices.
+
+    Example:
+        V = np.array([[1, 2, 3, 4, 5]])
+        W = np.array([[6, 7, 8, 9, 10]])
+        C, D = batch_one_point_crossover(V, W, [2])
+        print(C)  # Output: [[1 2 8 9 10]]
+        print(D)  # Output: [[6 7 3 4 5]]
+    """
+
+    V, W = np.asarray(V), np.asarray(W)
+    if c is None: c = (rng or np.random.default_rng()).integers(1, V.shape[1], len(V))
+    mask = np.arange(V.shape[1]) >= np.reshape(c, (-1, 1))
+    return np.where(mask, W, V), np.where(mask, V, W)
+
+def batch_n_points_crossover(V:np.ndarray,
+                             W:np.ndarray,
+                             l:np.ndarray
+)-> Tuple[np.ndarray, np.ndarray]:
+
+    """
+    Perform n-points crossover between every pair of rows of two parent matrices.
+
+    The parents are swapped after every cut point, so the segments between consecutive points
+    alternate between the two parents. Repeated points cancel each other.
+
+    Parameters:
+    - V (np.ndarray): The (pairs x genome length) matrix of first parents.
+    - W (np.ndarray): The (pairs x genome length) matrix of second parents.
+    - l (np.ndarray): The (pairs x n) matrix of crossover points, one row per pair.
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: The two child matrices.
+
+    Example:
+        V = np.array([[1, 2, 3, 4, 5, 6, 7]])
+        W = np.array([[8, 9, 10, 11, 12, 13, 14]])
+        C, D = batch_n_points_crossover(V, W, [[2, 4]])
+        print(C)  # Output: [[1 2 10 11 5 6 7]]
+        print(D)  # Output: [[8 9 3 4 12 13 14]]
+    """
+
+    V, W = np.asarray(V), np.asarray(W)
+    l = np.clip(np.asarray(l, dtype=np.intp).reshape(len(V), -1), 0, V.shape[1])
+    toggles = np.zeros((len(V), V.shape[1] + 1), dtype=np.int8)
+    np.add.at(toggles, (np.repeat(np.arange(len(V)), l.shape[1]), l.ravel()), 1)
+    mask = (np.cumsum(toggles, axis=1)[:, :V.shape[1]] % 2).astype(bool)
+    return np.where(mask, W, V), np.where(mask, V, W)
+
+def batch_random_crossover(V:np.ndarray,
+                           W:np.ndarray,
+                           p:float = None,
+                           mask:np.ndarray = None,
+                           rng:np.random.Generator = None
+)-> Tuple[np.ndarray, np.ndarray]:
+
+    """
+    Perform random crossover between every pair of rows of two parent matrices.
+
+    Parameters:
+    - V (np.ndarray): The (pairs x genome length) matrix of first parents.
+    - W (np.ndarray): The (pairs x genome length) matrix of second parents.
+    - p (float, optional): The probability of swapping each element (default is 1/genome length).
+    - mask (np.ndarray, optional): A boolean matrix marking the elements to swap; overrides p (default is None).
+    - rng (np.random.Generator, optional): The random generator used to draw the mask (default is a new generator).
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: The two child matrices.
+
+    Example:
+        V = np.array([[1, 2, 3, 4]])
+        W = np.array([[5, 6, 7, 8]])
+        C, D = batch_random_crossover(V, W, mask=[[False, True, False, True]])
+        print(C)  # Output: [[1 6 3 8]]
+        print(D)  # Output: [[5 2 7 4]]
+    """
+
+    V, W = np.asarray(V), np.asarray(W)
+    if mask is None:
+        p = p if p is not None else 1/V.shape[1]
+        mask = (rng or np.random.default_rng()).random(V.shape) < p
+    mask = np.asarray(mask, dtype=bool)
+    return np.where(mask, W, V), np.where(mask, V, W)
+
+def _as_row(v:Vector
+)-> np.ndarray:
+    if isinstance(v, np.ndarray): return v
+    return np.fromiter(v, dtype=object, count=len(v))
+
+def _sliced_crossover(v:Vector,
+                      w:Vector,
+                      l:list
+)-> Tuple[Vector,Vector]:
+    """Cross two sequences at the points in l by slicing, so the children keep the parents' type."""
+    C, D, start, swap = v[:0], w[:0], 0, False
+    for c in sorted(min(max(c, 0), len(v)) for c in l) + [len(v)]:
+        C, D = (C + w[start:c], D + v[start:c]) if swap else (C + v[start:c], D + w[start:c])
+        start, swap = c, not swap
+    return C, D
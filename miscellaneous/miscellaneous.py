@@ -1,7 +1,10 @@
-from typing import Any, Callable, List, bool
+from typing import Any, Callable, List, Tuple
+from collections import OrderedDict
 import queue
 import random
 import math
+import numpy as np
+from miscellaneous.multi_objective import evaluate_objectives, non_dominated_front
 
 
 def random_vector(len:int,
@@ -34,12 +37,13 @@ def bit_flip(p:float,
 
     Parameters:
     - p (float): The probability of flipping each bit.
-    - v (Any): The binary vector.
+    - v (Any): The binary vector, a list of booleans or a PackedBitVector.
 
     Returns:
     Any: The mutated binary vector.
     """
 
+    if isinstance(V, PackedBitVector): return V.bit_flip(p)
     return [not i if p > random.random() else i for i in V]
 
 def NewHomeBase(S:Any,
@@ -61,7 +65,8 @@ def NewHomeBase(S:Any,
 
     return S if quality(S)>=quality(W) else W
 
-def random_bit_vector(len:int
+def random_bit_vector(len:int,
+                      packed:bool = False
 )-> List[bool]:
     
     """
@@ -69,11 +74,13 @@ def random_bit_vector(len:int
 
     Parameters:
     - len (int): The length of the binary vector.
+    - packed (bool, optional): Whether to return a PackedBitVector instead of a list (default is False).
 
     Returns:
     List[bool]: A random binary vector.
     """
 
+    if packed: return PackedBitVector.random(len)
     return [random.random() > 0.5 for _ in range(len)]
 
 def pareto_dominance(A:Any,
@@ -90,16 +97,19 @@ def pareto_dominance(A:Any,
     - objectives: A list of objective functions to evaluate the solutions.
 
     Returns:
-    bool: True if A dominates B, False otherwise.
+    bool: True if A is at least as good as B in every objective and strictly better in one, False otherwise.
 
     Example:
     is_dominant = pareto_dominance(solution_A, solution_B, [objective_function_1, objective_function_2])
     print(is_dominant)
     """
 
+    better = False
     for o in objectives:
-        if o(A) < o(B): return False
-    return True
+        a, b = o(A), o(B)
+        if a < b: return False
+        better = better or a > b
+    return better
 
 
 def pareto_non_dominated_front(objectives:List[Callable],
@@ -109,6 +119,9 @@ def pareto_non_dominated_front(objectives:List[Callable],
     """
     Identify the Pareto non-dominated front in a population.
 
+    Every objective is evaluated once per solution and the dominance checks run vectorized on the
+    resulting matrix (see miscellaneous.multi_objective).
+
     Parameters:
     - objectives: A list of objective functions to evaluate the solutions.
     - subpop: The subpopulation for which to find the non-dominated front.
@@ -121,17 +134,8 @@ def pareto_non_dominated_front(objectives:List[Callable],
     print(non_dominated_front)
     """
 
-    F = List()
-    for s in subpop:
-        F.append(s)
-        for f in F:
-            if f ==s:continue
-            else:
-                if pareto_dominance(s, f, objectives): F.remove(f)
-                else: 
-                    F.remove(s)
-                    continue
-    return F
+    F = evaluate_objectives(subpop, objectives)
+    return [subpop[i] for i in non_dominated_front(F)]
 
 def binary_coding(value:float,
                   p_min:float,
@@ -217,6 +221,400 @@ class IterableQueue(queue.Queue):
     def __contains__(self, item):
         with self.mutex:
             return item in self.queue
-pass
 
 
+def genome_key(V:Any
+)-> Any:
+
+    """
+    Build a stable, hashable key for a genome.
+
+    Parameters:
+    - V (Any): The genome, a list, tuple, NumPy array or any hashable value.
+
+    Returns:
+    Any: A hashable key, equal for genomes with equal content.
+
+    Example:
+        print(genome_key([1, 2, 3]) == genome_key((1, 2, 3)))  # Output: True
+    """
+
+    if hasattr(V, "tobytes") and hasattr(V, "dtype"):
+        return (V.dtype.str, V.shape, V.tobytes())
+    if isinstance(V, (list, tuple)):
+        return tuple(map(genome_key, V))
+    if isinstance(V, (set, frozenset)):
+        return frozenset(map(genome_key, V))
+    return V
+
+# Marks a cache miss, so that a stored fitness of None is still a hit.
+_MISSING = object()
+
+class FitnessCache:
+
+    """
+    A memoizing wrapper around a fitness function with bounded LRU eviction.
+
+    The wrapped function is called only the first time a genome is seen; later calls with an equal
+    genome return the stored value. When more than `maxsize` genomes are stored, the least recently
+    used one is evicted. Genomes whose key is not hashable are evaluated without caching.
+
+    Methods:
+    - __call__(V): Return the fitness of V, evaluating it only on a cache miss.
+    - lookup(key, default): Return the value stored for key, or default (counts as a hit or a miss).
+    - store(key, value): Store the value computed for key.
+    - info(): Return the (hits, misses, maxsize, currsize) counters.
+    - clear(): Empty the cache and reset the counters.
+
+    Attributes:
+    - fitness: The wrapped fitness function.
+    - maxsize: The maximum number of stored genomes (None for unbounded).
+    - key: The function mapping a genome to its cache key (default is genome_key).
+    - hits: The number of calls answered from the cache.
+    - misses: The number of calls that evaluated the fitness function.
+
+    Example:
+        cached_fitness = FitnessCache(calculate_fitness, maxsize=10000)
+        best = genetic_algorithm(..., fitness=cached_fitness, ...)
+        print(cached_fitness.info())
+    """
+
+    def __init__(self, fitness:Callable, maxsize:int = None, key:Callable = genome_key):
+        self.fitness = fitness
+        self.maxsize = maxsize
+        self.key = key
+        self.hits = 0
+        self.misses = 0
+        self.cache = OrderedDict()
+
+    def __call__(self, V:Any)-> Any:
+        try:
+            k = self.key(V)
+            value = self.lookup(k, _MISSING)
+        except TypeError:
+            self.misses += 1
+            return self.fitness(V)
+        if value is _MISSING:
+            value = self.fitness(V)
+            self.store(k, value)
+        return value
+
+    def lookup(self, k:Any, default:Any = None)-> Any:
+        if k in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(k)
+            return self.cache[k]
+        self.misses += 1
+        return default
+
+    def store(self, k:Any, value:Any):
+        self.cache[k] = value
+        self.cache.move_to_end(k)
+        if self.maxsize is not None and len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def info(self)-> tuple:
+        return self.hits, self.misses, self.maxsize, len(self.cache)
+
+    def clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+class BasinCache:
+
+    """
+    A bounded cache of local optima for iterated local search.
+
+    It maps the fingerprint of the state a local search started from to the local optimum and quality
+    it reached, so a repeated descent can be skipped, and counts how many times each optimum (basin)
+    has been reached. Both maps evict their least recently used entry beyond `maxsize` entries.
+
+    Methods:
+    - lookup(S): Return the cached (optimum, quality) pair reached from S, or None.
+    - store(S, optimum, quality): Record the optimum reached from S and its quality (None if it was not computed).
+    - visit(optimum): Count one more visit to the optimum's basin and return the number of visits.
+
+    Attributes:
+    - maxsize: The maximum number of entries of each map (None for unbounded).
+    - fingerprint: The function mapping a state to its key (default is genome_key).
+    - hits: The number of descents answered from the cache.
+    - misses: The number of lookups that found nothing.
+
+    Example:
+        cache = BasinCache(10000)
+        best = ILS(S, 1000, quality, local_search, isIdeal, perturb, NHB, cache=cache, max_strength=5)
+        print(cache.hits, cache.misses)
+    """
+
+    def __init__(self, maxsize:int = None, fingerprint:Callable = genome_key):
+        self.maxsize = maxsize
+        self.fingerprint = fingerprint
+        self.optima = OrderedDict()
+        self.visits = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, S:Any)-> Tuple[Any, Any]:
+        k = self.fingerprint(S)
+        if k in self.optima:
+            self.hits += 1
+            self.optima.move_to_end(k)
+            return self.optima[k]
+        self.misses += 1
+        return None
+
+    def store(self, S:Any, optimum:Any, quality:Any = None):
+        self._bounded_set(self.optima, self.fingerprint(S), (optimum, quality))
+
+    def visit(self, optimum:Any)-> int:
+        k = self.fingerprint(optimum)
+        count = self.visits.get(k, 0) + 1
+        self._bounded_set(self.visits, k, count)
+        return count
+
+    def _bounded_set(self, entries:OrderedDict, k:Any, value:Any):
+        entries[k] = value
+        entries.move_to_end(k)
+        if self.maxsize is not None and len(entries) > self.maxsize: entries.popitem(last=False)
+
+class TabuList:
+
+    """
+    A fixed-size tabu list with O(1) membership tests.
+
+    Items are kept in a ring buffer of size l, with a multiset of their fingerprints: when the buffer
+    is full, putting a new item expires the oldest one. With a fingerprint function (e.g. a
+    ZobristHasher) only the fingerprints are stored and compared, never the full states.
+
+    Methods:
+    - put(item): Add an item, expiring the oldest one if the list is full.
+    - __contains__(item): Check if the item is in the list.
+    - __len__(): Return the number of items in the list.
+    - clear(): Empty the list.
+
+    Attributes:
+    - maxsize: The tenure, i.e. the number of items kept.
+    - fingerprint: The function mapping an item to the stored key (default is genome_key).
+
+    Example:
+        L = TabuList(1000, fingerprint=ZobristHasher(64, 64))
+        L.put(S)
+        print(S in L)  # Output: True
+    """
+
+    def __init__(self, maxsize:int, fingerprint:Callable = genome_key):
+        self.maxsize = maxsize
+        self.fingerprint = fingerprint
+        self.ring = [None] * maxsize
+        self.counts = dict()
+        self.head = 0
+        self.size = 0
+
+    def put(self, item:Any):
+        if self.maxsize <= 0: return
+        k = self.fingerprint(item)
+        if self.size == self.maxsize:
+            old = self.ring[self.head]
+            if self.counts[old] == 1: del self.counts[old]
+            else: self.counts[old] -= 1
+        else: self.size += 1
+        self.ring[self.head] = k
+        self.counts[k] = self.counts.get(k, 0) + 1
+        self.head = (self.head + 1) % self.maxsize
+
+    def __contains__(self, item:Any)-> bool:
+        return self.fingerprint(item) in self.counts
+
+    def __len__(self)-> int:
+        return self.size
+
+    def clear(self):
+        self.ring = [None] * self.maxsize
+        self.counts.clear()
+        self.head = 0
+        self.size = 0
+
+class FeatureTabuMemory:
+
+    """
+    A feature-indexed tabu memory with per-feature tenure.
+
+    Each feature maps to the first iteration at which it is no longer taboo, so checking its status is
+    a single comparison; a feature put during iteration i is taboo in iterations i+1 to i+tenure. Features are kept in a dict, or in an integer array when they are integers in
+    [0, features). Expired dict entries are purged every `tenure` iterations, so memory stays
+    proportional to the tenure over arbitrarily long runs.
+
+    Methods:
+    - put(feature): Make the feature taboo for the next `tenure` iterations.
+    - __contains__(feature): Check if the feature is currently taboo.
+    - tick(): Advance the iteration counter.
+
+    Attributes:
+    - tenure: The number of iterations a feature stays taboo.
+    - iteration: The current iteration.
+    - expiry: The dict or array mapping each feature to the iteration at which it expires.
+
+    Example:
+        L = FeatureTabuMemory(7)
+        L.put((3, 5))
+        print((3, 5) in L)  # Output: True
+    """
+
+    def __init__(self, tenure:int, features:int = None):
+        self.tenure = tenure
+        self.iteration = 0
+        self.expiry = dict() if features is None else np.zeros(features, dtype=np.int64)
+
+    def put(self, feature:Any):
+        # tick() runs at the end of the iteration that puts the feature, so it must outlive that one too
+        self.expiry[feature] = self.iteration + self.tenure + 1
+
+    def __contains__(self, feature:Any)-> bool:
+        if isinstance(self.expiry, dict): return self.expiry.get(feature, 0) > self.iteration
+        return self.expiry[feature] > self.iteration
+
+    def tick(self):
+        self.iteration += 1
+        if isinstance(self.expiry, dict) and self.tenure > 0 and self.iteration % self.tenure == 0:
+            self.expiry = {f: e for f, e in self.expiry.items() if e > self.iteration}
+
+class ZobristHasher:
+
+    """
+    Zobrist hashing of states made of positions holding one of a finite set of values.
+
+    Every (position, value) pair gets a random 64-bit key and the hash of a state is the XOR of the
+    keys of its pairs, so a move changing a few positions updates the hash in O(1) per position.
+
+    Methods:
+    - __call__(S): Return the hash of S, a sequence of integer values in [0, values).
+    - update(h, position, old, new): Return the hash after position changes from old to new.
+
+    Attributes:
+    - table: The (positions x values) array of random keys.
+
+    Example:
+        zobrist = ZobristHasher(8, 8)
+        h = zobrist([0, 1, 2, 3, 4, 5, 6, 7])
+        h = zobrist.update(h, 0, 0, 1)
+        print(h == zobrist([1, 1, 2, 3, 4, 5, 6, 7]))  # Output: True
+    """
+
+    def __init__(self, positions:int, values:int, seed:int = None):
+        self.table = np.random.default_rng(seed).integers(0, 2**64, (positions, values), dtype=np.uint64, endpoint=False)
+
+    def __call__(self, S:Any)-> int:
+        return int(np.bitwise_xor.reduce(self.table[np.arange(len(S)), np.asarray(S, dtype=np.intp)]))
+
+    def update(self, h:int, position:int, old:int, new:int)-> int:
+        return h ^ int(self.table[position, old]) ^ int(self.table[position, new])
+
+class PackedBitVector:
+
+    """
+    A binary genome packed into 64-bit words.
+
+    Bit i is stored in word i // 64 at position i % 64; the unused high bits of the last word are
+    always zero, so word-wise operations (popcount, Hamming distance, equality) need no masking.
+
+    Methods:
+    - random(len, rng): Build a random bit vector of the given length.
+    - from_bools(V): Build a bit vector from a sequence of booleans.
+    - to_bools(): Return the bits as a NumPy boolean array.
+    - bit_flip(p, rng): Return a copy with each bit flipped with probability p.
+    - uniform_crossover(other, p, rng): Return the two children of a uniform crossover.
+    - one_point_crossover(other, c): Return the two children of a one-point crossover at bit c.
+    - popcount(): Return the number of set bits.
+    - hamming(other): Return the number of differing bits.
+    - __len__(), __getitem__(i), __eq__(other), __hash__()
+
+    Attributes:
+    - words: The uint64 array of packed bits.
+    - length: The number of bits.
+
+    Example:
+        V = PackedBitVector.random(100000)
+        W = V.bit_flip(0.001)
+        print(V.hamming(W), V.popcount())
+    """
+
+    def __init__(self, words:np.ndarray, length:int):
+        self.words = np.asarray(words, dtype=np.uint64)
+        self.length = length
+
+    @classmethod
+    def random(cls, len:int, rng:np.random.Generator = None)-> "PackedBitVector":
+        words = (rng or np.random.default_rng()).integers(0, 2**64, -(-len // 64), dtype=np.uint64, endpoint=False)
+        return cls(words & _tail_mask(len), len)
+
+    @classmethod
+    def from_bools(cls, V:Any)-> "PackedBitVector":
+        bits = np.asarray(V, dtype=bool)
+        padded = np.zeros(-(-len(bits) // 64) * 64, dtype=bool)
+        padded[:len(bits)] = bits
+        return cls(np.packbits(padded, bitorder="little").view("<u8").astype(np.uint64), len(bits))
+
+    def to_bools(self)-> np.ndarray:
+        return np.unpackbits(self.words.astype("<u8").view(np.uint8), bitorder="little")[:self.length].astype(bool)
+
+    def bit_flip(self, p:float, rng:np.random.Generator = None)-> "PackedBitVector":
+        rng = rng or np.random.default_rng()
+        flips = rng.choice(self.length, rng.binomial(self.length, p), replace=False)
+        mask = np.zeros_like(self.words)
+        np.bitwise_or.at(mask, flips >> 6, np.left_shift(np.uint64(1), (flips & 63).astype(np.uint64)))
+        return PackedBitVector(self.words ^ mask, self.length)
+
+    def uniform_crossover(self, other:"PackedBitVector", p:float = 0.5,
+                          rng:np.random.Generator = None)-> Tuple["PackedBitVector", "PackedBitVector"]:
+        rng = rng or np.random.default_rng()
+        if p == 0.5: mask = rng.integers(0, 2**64, len(self.words), dtype=np.uint64, endpoint=False)
+        else: mask = PackedBitVector.from_bools(rng.random(self.length) < p).words
+        return self._swap(other, mask)
+
+    def one_point_crossover(self, other:"PackedBitVector",
+                            c:int)-> Tuple["PackedBitVector", "PackedBitVector"]:
+        word, bit = divmod(c, 64)
+        mask = np.zeros_like(self.words)
+        mask[word:] = ~np.uint64(0)
+        if bit and word < len(mask): mask[word] = ~np.uint64(0) << np.uint64(bit)
+        return self._swap(other, mask)
+
+    def popcount(self)-> int:
+        return int(_popcount(self.words).sum())
+
+    def hamming(self, other:"PackedBitVector")-> int:
+        return int(_popcount(self.words ^ other.words).sum())
+
+    def _swap(self, other:"PackedBitVector", mask:np.ndarray)-> Tuple["PackedBitVector", "PackedBitVector"]:
+        mask = mask & _tail_mask(self.length)
+        return (PackedBitVector((self.words & ~mask) | (other.words & mask), self.length),
+                PackedBitVector((other.words & ~mask) | (self.words & mask), self.length))
+
+    def __len__(self)-> int:
+        return self.length
+
+    def __getitem__(self, i:int)-> bool:
+        if not -self.length <= i < self.length: raise IndexError("bit index out of range")
+        i %= self.length
+        return bool((int(self.words[i >> 6]) >> (i & 63)) & 1)
+
+    def __eq__(self, other:Any)-> bool:
+        return isinstance(other, PackedBitVector) and self.length == other.length and np.array_equal(self.words, other.words)
+
+    def __hash__(self)-> int:
+        return hash((self.length, self.words.tobytes()))
+
+def _tail_mask(len:int
+)-> np.ndarray:
+    mask = np.full(-(-len // 64), ~np.uint64(0), dtype=np.uint64)
+    if len % 64: mask[-1] = (np.uint64(1) << np.uint64(len % 64)) - np.uint64(1)
+    return mask
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+def _popcount(words:np.ndarray
+)-> np.ndarray:
+    if hasattr(np, "bitwise_count"): return np.bitwise_count(words)
+    return _BYTE_POPCOUNT[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+pass
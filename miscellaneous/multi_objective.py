@@ -0,0 +1,469 @@
+from typing import Any, Callable, List, Tuple
+from operator import ge
+import numpy as np
+
+# Upper bound on the number of (row, column) pairs compared at once by the blocked dominance kernels,
+# so that an n x n dominance test never materialises a full n x n boolean matrix.
+_BLOCK_BUDGET = 1 << 24
+
+
+def evaluate_objectives(P:List[Any],
+                        objectives:List[Callable]
+)-> np.ndarray:
+
+    """
+    Evaluate every objective once on every solution of a population.
+
+    Parameters:
+    - P (List[Any]): The population.
+    - objectives (List[Callable]): The objective functions, all to be maximized.
+
+    Returns:
+    np.ndarray: The (len(P) x len(objectives)) matrix of objective values, row i belonging to P[i].
+
+    Example:
+        F = evaluate_objectives(population, [objective_function_1, objective_function_2])
+    """
+
+    F = np.empty((len(P), len(objectives)), dtype=float)
+    for i, p in enumerate(P):
+        F[i] = [o(p) for o in objectives]
+    return F
+
+
+def dominates(a:np.ndarray,
+              b:np.ndarray
+)-> bool:
+
+    """
+    Check if objective vector a Pareto dominates objective vector b (maximization).
+
+    Parameters:
+    - a (np.ndarray): The first objective vector.
+    - b (np.ndarray): The second objective vector.
+
+    Returns:
+    bool: True if a is at least as good as b in every objective and strictly better in one.
+
+    Example:
+        dominates(F[0], F[1])
+    """
+
+    a, b = np.asarray(a), np.asarray(b)
+    return bool(np.all(a >= b) and np.any(a > b))
+
+
+def dominance_counts(F:np.ndarray,
+                     block:int = None
+)-> np.ndarray:
+
+    """
+    Count, for every solution, how many solutions of the population dominate it.
+
+    Parameters:
+    - F (np.ndarray): The (n x m) matrix of objective values.
+    - block (int, optional): The number of rows compared at once (default fits a fixed memory budget).
+
+    Returns:
+    np.ndarray: The length-n array of domination counts; the non-dominated front is where it is 0.
+
+    Example:
+        front = np.flatnonzero(dominance_counts(F) == 0)
+    """
+
+    order, G = _lexicographic_order(F)
+    block = _block_size(G, block)
+    counts = np.zeros(len(G), dtype=np.int64)
+    for start in range(0, len(G), block):
+        counts[start:] += _dominance_block(G[start:start + block], G[start:]).sum(axis=0, dtype=np.int64)
+    unsorted = np.empty_like(counts)
+    unsorted[order] = counts
+    return unsorted
+
+
+def non_dominated_front(F:np.ndarray,
+                        block:int = None
+)-> np.ndarray:
+
+    """
+    Identify the Pareto non-dominated front of a population.
+
+    Parameters:
+    - F (np.ndarray): The (n x m) matrix of objective values.
+    - block (int, optional): The number of rows compared at once (default fits a fixed memory budget).
+
+    Returns:
+    np.ndarray: The indices of the non-dominated solutions, in increasing order.
+
+    Example:
+        front = [population[i] for i in non_dominated_front(F)]
+    """
+
+    return np.flatnonzero(dominance_counts(F, block) == 0)
+
+
+def fast_non_dominated_sort(F:np.ndarray,
+                            block:int = None
+)-> List[np.ndarray]:
+
+    """
+    Sort a population into ranked Pareto fronts (the NSGA-II fast non-dominated sort).
+
+    The solutions are first sorted in decreasing lexicographic order, so that a solution can only be
+    dominated by the ones before it and only half of the pairs need comparing. The dominance relation is
+    then computed once, block by block, into a bit-packed (n x n/8) matrix together with the domination
+    counts; fronts are peeled off by subtracting the rows of the current front from the counts, so every
+    front costs one pass over the rows it dominates.
+
+    Parameters:
+    - F (np.ndarray): The (n x m) matrix of objective values.
+    - block (int, optional): The number of rows compared at once (default fits a fixed memory budget).
+
+    Returns:
+    List[np.ndarray]: The fronts as arrays of indices, the non-dominated front first.
+
+    Example:
+        fronts = fast_non_dominated_sort(evaluate_objectives(population, objectives))
+        rank_1 = [population[i] for i in fronts[0]]
+    """
+
+    order, G = _lexicographic_order(F)
+    n = len(G)
+    block = _block_size(G, block)
+    dominated = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+    counts = np.zeros(n, dtype=np.int64)
+    for start in range(0, n, block):
+        D = _dominance_block(G[start:start + block], G[start:])
+        counts[start:] += D.sum(axis=0, dtype=np.int64)
+        dominated[start:start + block, start // 8:] = np.packbits(D, axis=1)
+
+    fronts = []
+    front = np.flatnonzero(counts == 0)
+    while len(front):
+        fronts.append(np.sort(order[front]))
+        counts[front] = -1
+        for start in range(0, len(front), block):
+            counts -= np.unpackbits(dominated[front[start:start + block]], axis=1, count=n).sum(axis=0, dtype=np.int64)
+        front = np.flatnonzero(counts == 0)
+    return fronts
+
+
+def crowding_distance(F:np.ndarray
+)-> np.ndarray:
+
+    """
+    Compute the NSGA-II crowding distance of the solutions of one front.
+
+    Parameters:
+    - F (np.ndarray): The (n x m) matrix of objective values of the front.
+
+    Returns:
+    np.ndarray: The length-n array of crowding distances; boundary solutions get infinity.
+
+    Example:
+        distances = crowding_distance(F[fronts[0]])
+    """
+
+    F = np.asarray(F, dtype=float)
+    n, m = F.shape
+    distance = np.zeros(n)
+    if n <= 2:
+        distance[:] = np.inf
+        return distance
+    for j in range(m):
+        order = np.argsort(F[:, j], kind="stable")
+        values = F[order, j]
+        distance[order[[0, -1]]] = np.inf
+        span = values[-1] - values[0]
+        if span > 0: distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+    return distance
+
+
+def nsga2_selection(F:np.ndarray,
+                    k:int,
+                    block:int = None
+)-> np.ndarray:
+
+    """
+    Select k solutions by Pareto rank, breaking ties in the last admitted front by crowding distance.
+
+    Parameters:
+    - F (np.ndarray): The (n x m) matrix of objective values.
+    - k (int): The number of solutions to select.
+    - block (int, optional): The number of rows compared at once (default fits a fixed memory budget).
+
+    Returns:
+    np.ndarray: The indices of the k selected solutions.
+
+    Example:
+        survivors = [population[i] for i in nsga2_selection(F, mu)]
+    """
+
+    selected = []
+    remaining = k
+    for front in fast_non_dominated_sort(F, block):
+        if remaining <= 0: break
+        if len(front) > remaining:
+            distance = crowding_distance(np.asarray(F)[front])
+            front = front[np.argsort(-distance, kind="stable")[:remaining]]
+        selected.append(front)
+        remaining -= len(front)
+    return np.concatenate(selected) if selected else np.empty(0, dtype=np.int64)
+
+
+def _dominance_block(A:np.ndarray,
+                     F:np.ndarray
+)-> np.ndarray:
+    """Return the boolean matrix whose (i, j) entry tells whether A[i] dominates F[j]."""
+    at_least = np.ones((len(A), len(F)), dtype=bool)
+    better = np.zeros((len(A), len(F)), dtype=bool)
+    for j in range(F.shape[1]):
+        a, f = A[:, j, None], F[None, :, j]
+        at_least &= a >= f
+        better |= a > f
+    return at_least & better
+
+def _block_size(F:np.ndarray,
+                block:int = None
+)-> int:
+    """Return the number of rows to compare at once against F, a multiple of 8 to keep packed rows aligned."""
+    block = block or _BLOCK_BUDGET // max(1, len(F))
+    return max(8, block - block % 8)
+
+def _lexicographic_order(F:np.ndarray
+)-> Tuple[np.ndarray, np.ndarray]:
+    """Return the permutation sorting the rows of F in decreasing lexicographic order, and the sorted rows."""
+    F = np.asarray(F, dtype=float)
+    order = np.lexsort(-F.T[::-1]) if F.size else np.arange(len(F))
+    return order, F[order]
+
+
+class ParetoArchive:
+
+    """
+    A bounded archive of mutually non-dominated solutions (maximization), stored in an ND-tree.
+
+    Every node of the tree keeps the ideal (component-wise best) and nadir (component-wise worst) objective
+    vectors of the points below it, so a new point is compared only with the subtrees whose bounding box
+    it can dominate or be dominated by: a whole subtree is skipped when the point neither dominates its
+    nadir nor is dominated by its ideal, rejected at once when the nadir already dominates it, and dropped
+    at once when the point dominates its ideal. Leaves hold up to `max_leaf` points and are split in
+    `branching` children around far-apart seeds. When the archive grows past `maxsize`, the most crowded
+    point (smallest crowding distance) of the neighbourhood of the new point is evicted.
+
+    Methods:
+    - add(item, f): Insert item with objective vector f and return its id, or None if it is dominated.
+    - dominated(f): Return True if the objective vector f is weakly dominated by a point of the archive.
+    - get(id): Return the (item, objective vector) pair stored under id.
+    - remove(id): Remove the point stored under id.
+    - items(): Return the list of archived items.
+    - objective_matrix(): Return the (len x m) matrix of the archived objective vectors.
+    - __len__(): Return the number of archived points.
+    - __contains__(id): Return True if a point is stored under id.
+    - __iter__(): Iterate over the (id, item, objective vector) triples.
+
+    Attributes:
+    - objectives: The objective functions used when add is given no objective vector.
+    - maxsize: The maximum number of archived points, or None for an unbounded archive.
+    - max_leaf: The maximum number of points in a leaf before it is split.
+    - branching: The number of children of a split leaf (default is the number of objectives + 1).
+
+    Example:
+        archive = ParetoArchive([objective_function_1, objective_function_2], maxsize=100000)
+        for child in offspring:
+            archive.add(child)
+        front = archive.items()
+    """
+
+    def __init__(self,
+                 objectives:List[Callable] = None,
+                 maxsize:int = None,
+                 max_leaf:int = 20,
+                 branching:int = None
+    ):
+        self.objectives = objectives
+        self.maxsize = maxsize
+        self.max_leaf = max(2, max_leaf)
+        self.branching = branching
+        self._root = None
+        self._points = {}
+        self._leaf_of = {}
+        self._next_id = 0
+
+    def add(self, item:Any, f:Any = None)-> int:
+        f = tuple(float(x) for x in (f if f is not None else [o(item) for o in self.objectives]))
+        if self._root is not None and not self._update(self._root, f): return None
+        if self._root is None: self._root = _NDNode(None, f)
+        id = self._next_id
+        self._next_id += 1
+        self._points[id] = (item, f)
+        leaf = self._insert(id, f)
+        if self.maxsize is not None and len(self._points) > self.maxsize: self._evict(leaf)
+        return id if id in self._points else None
+
+    def dominated(self, f:Any)-> bool:
+        f = tuple(float(x) for x in f)
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if _weakly_dominates(node.nadir, f): return True
+            if not _weakly_dominates(node.ideal, f): continue
+            if node.children is None:
+                if any(_weakly_dominates(self._points[id][1], f) for id in node.ids): return True
+            else: stack.extend(node.children)
+        return False
+
+    def get(self, id:int)-> Tuple[Any, Tuple[float, ...]]:
+        return self._points[id]
+
+    def remove(self, id:int):
+        leaf = self._leaf_of.pop(id)
+        del self._points[id]
+        leaf.ids.remove(id)
+        self._prune(leaf)
+
+    def items(self)-> List[Any]:
+        return [item for item, _ in self._points.values()]
+
+    def objective_matrix(self)-> np.ndarray:
+        return np.array([f for _, f in self._points.values()], dtype=float).reshape(len(self._points), -1)
+
+    def __len__(self)-> int:
+        return len(self._points)
+
+    def __contains__(self, id:int)-> bool:
+        return id in self._points
+
+    def __iter__(self):
+        for id, (item, f) in list(self._points.items()):
+            yield id, item, f
+
+    def _update(self, node:"_NDNode", f:Tuple[float, ...])-> bool:
+        """Drop the points of the subtree dominated by f; return False if f is weakly dominated instead."""
+        if _weakly_dominates(node.nadir, f): return False
+        if _weakly_dominates(f, node.ideal):
+            self._discard(node)
+            return True
+        if not (_weakly_dominates(node.ideal, f) or _weakly_dominates(f, node.nadir)): return True
+        if node.children is None:
+            for id in list(node.ids):
+                p = self._points[id][1]
+                if _weakly_dominates(p, f): return False
+                if _weakly_dominates(f, p): self.remove(id)
+            return True
+        for child in list(node.children):
+            if not self._update(child, f): return False
+        return True
+
+    def _discard(self, node:"_NDNode"):
+        """Remove a whole subtree and its points from the archive."""
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            if n.children is not None: stack.extend(n.children)
+            for id in n.ids:
+                del self._points[id]
+                del self._leaf_of[id]
+        if node.parent is None: self._root = None
+        else:
+            node.parent.children.remove(node)
+            self._prune(node.parent)
+
+    def _prune(self, node:"_NDNode"):
+        """Detach the empty nodes on the path from node to the root and tighten the bounds along it."""
+        while node is not None:
+            parent = node.parent
+            if node.children is None and not node.ids or node.children == []:
+                if parent is None: self._root = None
+                else: parent.children.remove(node)
+            else: node.refresh(self._points)
+            node = parent
+
+    def _insert(self, id:int, f:Tuple[float, ...])-> "_NDNode":
+        """Descend to the leaf with the closest midpoint, widening the bounds on the way, and store id there."""
+        node = self._root
+        while True:
+            node.extend(f)
+            if node.children is None: break
+            node = min(node.children, key=lambda c: c.distance(f))
+        node.ids.append(id)
+        self._leaf_of[id] = node
+        if len(node.ids) > self.max_leaf: self._split(node)
+        return self._leaf_of[id]
+
+    def _split(self, leaf:"_NDNode"):
+        """Turn an overfull leaf into an internal node with `branching` leaf children."""
+        ids = leaf.ids
+        P = np.array([self._points[id][1] for id in ids])
+        k = min(len(ids), self.branching or P.shape[1] + 1)
+        D = np.sqrt(((P[:, None, :] - P[None, :, :]) ** 2).sum(axis=2))
+        seeds = [int(np.argmax(D.sum(axis=1)))]
+        nearest = D[seeds[0]].copy()
+        while len(seeds) < k:
+            seeds.append(int(np.argmax(nearest)))
+            nearest = np.minimum(nearest, D[seeds[-1]])
+        leaf.ids = []
+        leaf.children = [_NDNode(leaf, tuple(P[s])) for s in seeds]
+        for child, s in zip(leaf.children, seeds):
+            child.ids.append(ids[s])
+            self._leaf_of[ids[s]] = child
+        chosen = set(seeds)
+        for i, id in enumerate(ids):
+            if i in chosen: continue
+            f = self._points[id][1]
+            child = min(leaf.children, key=lambda c: c.distance(f))
+            child.extend(f)
+            child.ids.append(id)
+            self._leaf_of[id] = child
+
+    def _evict(self, leaf:"_NDNode"):
+        """Remove the most crowded point of the smallest subtree around leaf holding at least three points."""
+        node = leaf
+        while node.parent is not None and node.size() < 3:
+            node = node.parent
+        ids = node.point_ids()
+        distance = crowding_distance(np.array([self._points[id][1] for id in ids]))
+        self.remove(ids[int(np.argmin(distance))])
+
+
+class _NDNode:
+
+    """
+    A node of the ND-tree of a ParetoArchive: a leaf holds point ids, an internal node holds children.
+    """
+
+    __slots__ = ("parent", "children", "ids", "ideal", "nadir")
+
+    def __init__(self, parent:"_NDNode", f:Tuple[float, ...]):
+        self.parent = parent
+        self.children = None
+        self.ids = []
+        self.ideal = list(f)
+        self.nadir = list(f)
+
+    def extend(self, f:Tuple[float, ...]):
+        for j, x in enumerate(f):
+            if x > self.ideal[j]: self.ideal[j] = x
+            if x < self.nadir[j]: self.nadir[j] = x
+
+    def refresh(self, points:dict):
+        bounds = [points[id][1] for id in self.ids] if self.children is None else \
+                 [b for c in self.children for b in (c.ideal, c.nadir)]
+        self.ideal = [max(column) for column in zip(*bounds)]
+        self.nadir = [min(column) for column in zip(*bounds)]
+
+    def distance(self, f:Tuple[float, ...])-> float:
+        return sum((x - (a + b) / 2) ** 2 for x, a, b in zip(f, self.ideal, self.nadir))
+
+    def size(self)-> int:
+        return len(self.ids) if self.children is None else sum(c.size() for c in self.children)
+
+    def point_ids(self)-> List[int]:
+        return list(self.ids) if self.children is None else [id for c in self.children for id in c.point_ids()]
+
+
+def _weakly_dominates(a:Any,
+                      b:Any
+)-> bool:
+    """Return True if a is at least as good as b in every objective."""
+    return all(map(ge, a, b))
@@ -0,0 +1,101 @@
+from typing import Any, Callable, List, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+import os
+from miscellaneous.miscellaneous import FitnessCache, _MISSING
+
+Vector = List[Any]
+
+
+class PoolEvaluator:
+
+    """
+    Evaluate the fitness of a population on a process pool.
+
+    The population is split in chunks of `chunksize` individuals and fanned out over the pool; results
+    come back in the original population order. When the fitness function is a FitnessCache, only the
+    genomes missing from the cache are sent to the workers and their values are stored back in it.
+    The fitness function must be picklable (e.g. defined at module level).
+
+    Methods:
+    - __call__(P): Return the list of (individual, fitness) pairs of P, like an assess_fitness function.
+    - map(P): Return the list of fitness values of P.
+    - submit(V): Schedule the evaluation of V alone and return its Future (the cache is bypassed).
+    - shutdown(cancel): Shut the pool down, cancelling pending evaluations if cancel is True.
+
+    Attributes:
+    - fitness: The fitness function to evaluate.
+    - chunksize: The number of individuals sent to a worker in one task.
+    - workers: The number of worker processes.
+    - executor: The underlying ProcessPoolExecutor.
+
+    Example:
+        with PoolEvaluator(calculate_fitness, max_workers=32, chunksize=16) as evaluator:
+            fitted_P = evaluator(population)
+    """
+
+    def __init__(self, fitness:Callable, max_workers:int = None, chunksize:int = 1):
+        self.fitness = fitness
+        self.chunksize = chunksize
+        self.workers = max_workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(self.workers)
+
+    def __call__(self, P:Vector)-> List[Tuple[Any, Any]]:
+        return list(zip(P, self.map(P)))
+
+    def map(self, P:Vector)-> List[Any]:
+        if not isinstance(self.fitness, FitnessCache):
+            return list(self.executor.map(self.fitness, P, chunksize=self.chunksize))
+        cache = self.fitness
+        keys = [cache.key(p) for p in P]
+        known = {}
+        missing = {}
+        for k, p in zip(keys, P):
+            if k in known or k in missing: continue
+            value = cache.lookup(k, _MISSING)
+            if value is _MISSING: missing[k] = p
+            else: known[k] = value
+        values = self.executor.map(cache.fitness, missing.values(), chunksize=self.chunksize)
+        for k, value in zip(missing, values):
+            cache.store(k, value)
+            known[k] = value
+        return [known[k] for k in keys]
+
+    def submit(self, V:Any)-> Future:
+        fitness = self.fitness.fitness if isinstance(self.fitness, FitnessCache) else self.fitness
+        return self.executor.submit(fitness, V)
+
+    def shutdown(self, cancel:bool = False):
+        self.executor.shutdown(cancel_futures=cancel)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+
+def make_evaluator(evaluation:str,
+                   fitness:Callable,
+                   max_workers:int = None,
+                   chunksize:int = 1
+)-> PoolEvaluator:
+
+    """
+    Build the population evaluator for an evaluation backend.
+
+    Parameters:
+    - evaluation (str): The backend, "serial" or "process".
+    - fitness (Callable): A function to evaluate the fitness of an individual.
+    - max_workers (int, optional): The number of worker processes (default is the number of CPUs).
+    - chunksize (int, optional): The number of individuals sent to a worker in one task (default is 1).
+
+    Returns:
+    PoolEvaluator: A process pool evaluator, or None for the serial backend.
+
+    Example:
+        evaluator = make_evaluator("process", calculate_fitness, max_workers=8)
+    """
+
+    if evaluation == "serial": return None
+    if evaluation == "process": return PoolEvaluator(fitness, max_workers, chunksize)
+    raise ValueError(f"Unknown evaluation backend: {evaluation!r}")
@@ -0,0 +1,56 @@
+from typing import Any, Callable, List, Tuple
+import numpy as np
+
+
+class MatrixPopulation:
+
+    """
+    A population of fixed-length genomes stored as one contiguous 2-D NumPy array.
+
+    Row i of `genomes` is the i-th individual and `fitness[i]` its fitness (NaN until evaluated), so
+    batch operators can act on whole index arrays instead of one individual at a time.
+
+    Methods:
+    - from_individuals(individuals, dtype): Build a population from a list of genomes.
+    - evaluate(assess_fitness): Fill `fitness` with assess_fitness(genomes), a batch fitness function.
+    - take(indices): Return the genomes at the given indices as a new matrix.
+    - best(): Return the (genome, fitness) pair of the fittest evaluated individual.
+    - __len__(): Return the number of individuals.
+    - __getitem__(i): Return the genome of the i-th individual.
+
+    Attributes:
+    - genomes: The (population size x genome length) matrix of genomes.
+    - fitness: The 1-D array of fitness values, parallel to the rows of `genomes`.
+
+    Example:
+        P = MatrixPopulation.from_individuals([random_bit_vector(1000) for _ in range(10000)])
+        P.evaluate(batch_fitness)
+        print(P.best())
+    """
+
+    def __init__(self, genomes:np.ndarray, fitness:np.ndarray = None):
+        self.genomes = np.ascontiguousarray(genomes)
+        if self.genomes.ndim != 2:
+            raise ValueError("genomes must be a 2-D array with one individual per row")
+        self.fitness = np.full(len(self.genomes), np.nan) if fitness is None else np.asarray(fitness, dtype=float)
+
+    @classmethod
+    def from_individuals(cls, individuals:List[Any], dtype:Any = None)-> "MatrixPopulation":
+        return cls(np.array(individuals, dtype=dtype))
+
+    def evaluate(self, assess_fitness:Callable)-> np.ndarray:
+        self.fitness = np.asarray(assess_fitness(self.genomes), dtype=float)
+        return self.fitness
+
+    def take(self, indices:np.ndarray)-> np.ndarray:
+        return self.genomes[indices]
+
+    def best(self)-> Tuple[np.ndarray, float]:
+        i = int(np.nanargmax(self.fitness))
+        return self.genomes[i].copy(), float(self.fitness[i])
+
+    def __len__(self)-> int:
+        return len(self.genomes)
+
+    def __getitem__(self, i:int)-> np.ndarray:
+        return self.genomes[i]
@@ -1,8 +1,8 @@
 from typing import Any, Callable, Set, Tuple, List
 import random
+import numpy as np
 
-if __name__ == "__main__":
-    Vector = Set[Any]
+Vector = Set[Any]
 
 
 def line_recombination(V:Vector,
@@ -34,12 +34,12 @@ def line_recombination(V:Vector,
         print(result_vector1, result_vector2)
     """
 
-    alpha, beta = random.randrange(-deviation, 1+deviation), random.randrange(-deviation, 1+deviation)
+    alpha, beta = random.uniform(-deviation, 1+deviation), random.uniform(-deviation, 1+deviation)
     t:Vector = None
     s:Vector = None
-    for i in len(V):
-        t = sum(mul(alpha,V[i]), mul(1+alpha, W[i]))
-        s = sum(mul(beta,W[i]), mul(1+beta, V[i]))
+    for i in range(len(V)):
+        t = sum(mul(alpha,V[i]), mul(1-alpha, W[i]))
+        s = sum(mul(beta,W[i]), mul(1-beta, V[i]))
         if check_on_deviation(t,s):
             V[i] = t
             W[i] = s
@@ -75,18 +75,132 @@ def intermediate_recombination(V:Vector,
         print(result_vector1, result_vector2)
     """
 
-
-    alpha, beta = random.randrange(-deviation, 1+deviation), random.randrange(-deviation, 1+deviation)
     t:Vector = None
     s:Vector = None
-    for i in len(V):
-        alpha, beta = random.randrange(-deviation, 1+deviation), random.randrange(-deviation, 1+deviation)
-        t:Vector = None
-        s:Vector = None 
-        while not check_on_deviation(t,s):
-            t = sum(mul(alpha,V[i]), mul(1+alpha, W[i]))
-            s = sum(mul(beta,W[i]), mul(1+beta, V[i]))
+    for i in range(len(V)):
+        while True:
+            alpha, beta = random.uniform(-deviation, 1+deviation), random.uniform(-deviation, 1+deviation)
+            t = sum(mul(alpha,V[i]), mul(1-alpha, W[i]))
+            s = sum(mul(beta,W[i]), mul(1-beta, V[i]))
+            if check_on_deviation(t,s): break
         V[i] = t
         W[i] = s
     return V,W
 
+
+def batch_line_recombination(V:np.ndarray,
+                             W:np.ndarray,
+                             deviation:float = 0.25,
+                             min:Any = -np.inf,
+                             max:Any = np.inf,
+                             rng:np.random.Generator = None
+)-> Tuple[np.ndarray, np.ndarray]:
+
+    """
+    Perform line recombination on many parent pairs at once.
+
+    Row i of V and row i of W are a parent pair; as in line_recombination, each pair gets one alpha and
+    one beta, drawn in [-deviation, 1+deviation], the candidate genes are t = alpha*V + (1-alpha)*W and
+    s = beta*W + (1-beta)*V, and each gene takes t and s only where both are within [min, max], keeping
+    the parents' values elsewhere.
+
+    Parameters:
+    - V (np.ndarray): The first parents, one per row (a single vector is also accepted).
+    - W (np.ndarray): The second parents, with the same shape as V.
+    - deviation (float, optional): How far beyond the segment between the parents children may fall (default is 0.25).
+    - min (Any, optional): The minimum allowable value, a scalar or one value per gene (default is -inf).
+    - max (Any, optional): The maximum allowable value, a scalar or one value per gene (default is inf).
+    - rng (np.random.Generator, optional): The random generator (default is a fresh one).
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: The two matrices of children.
+
+    Example:
+        T, S = batch_line_recombination(P.take(p_a), P.take(p_b), 0.25, -5.0, 5.0)
+    """
+
+    rng = rng or np.random.default_rng()
+    V, W = np.asarray(V, dtype=float), np.asarray(W, dtype=float)
+    pairs = V.shape[:-1] + (1,) if V.ndim else ()
+    alpha = rng.uniform(-deviation, 1+deviation, pairs)
+    beta = rng.uniform(-deviation, 1+deviation, pairs)
+    t = alpha*V + (1-alpha)*W
+    s = beta*W + (1-beta)*V
+    in_bounds = (t >= min) & (t <= max) & (s >= min) & (s <= max)
+    return np.where(in_bounds, t, V), np.where(in_bounds, s, W)
+
+
+def batch_intermediate_recombination(V:np.ndarray,
+                                     W:np.ndarray,
+                                     deviation:float = 0.25,
+                                     min:Any = -np.inf,
+                                     max:Any = np.inf,
+                                     rng:np.random.Generator = None,
+                                     max_tries:int = 100
+)-> Tuple[np.ndarray, np.ndarray]:
+
+    """
+    Perform intermediate recombination on many parent pairs at once.
+
+    As in intermediate_recombination, every gene of every pair gets its own alpha and beta, redrawn until
+    the gene is within [min, max]; the redraws are vectorized over the out-of-range genes only, and a
+    gene still out of range after max_tries redraws keeps its parent's value.
+
+    Parameters:
+    - V (np.ndarray): The first parents, one per row (a single vector is also accepted).
+    - W (np.ndarray): The second parents, with the same shape as V.
+    - deviation (float, optional): How far beyond the segment between the parents genes may fall (default is 0.25).
+    - min (Any, optional): The minimum allowable value, a scalar or one value per gene (default is -inf).
+    - max (Any, optional): The maximum allowable value, a scalar or one value per gene (default is inf).
+    - rng (np.random.Generator, optional): The random generator (default is a fresh one).
+    - max_tries (int, optional): The maximum number of redraws (default is 100).
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: The two matrices of children.
+
+    Example:
+        T, S = batch_intermediate_recombination(P.take(p_a), P.take(p_b), 0.25, 0.0, 1.0)
+    """
+
+    rng = rng or np.random.default_rng()
+    V, W = np.asarray(V, dtype=float), np.asarray(W, dtype=float)
+    return _batch_recombination(V, W, (V.size, 1), deviation, min, max, rng, max_tries)
+
+
+def _batch_recombination(V:np.ndarray,
+                         W:np.ndarray,
+                         units:Tuple[int, int],
+                         deviation:float,
+                         min:Any,
+                         max:Any,
+                         rng:np.random.Generator,
+                         max_tries:int
+)-> Tuple[np.ndarray, np.ndarray]:
+    """Recombine V and W with one coefficient per entry of the `units` reshaping, redrawing the out-of-range entries."""
+    lo = np.broadcast_to(np.asarray(min, dtype=float), V.shape).reshape(units)
+    hi = np.broadcast_to(np.asarray(max, dtype=float), V.shape).reshape(units)
+    V2, W2 = V.reshape(units), W.reshape(units)
+    T = _combination_in_bounds(V2, W2, lo, hi, deviation, rng, max_tries)
+    S = _combination_in_bounds(W2, V2, lo, hi, deviation, rng, max_tries)
+    return T.reshape(V.shape), S.reshape(V.shape)
+
+def _combination_in_bounds(A:np.ndarray,
+                           B:np.ndarray,
+                           lo:np.ndarray,
+                           hi:np.ndarray,
+                           deviation:float,
+                           rng:np.random.Generator,
+                           max_tries:int
+)-> np.ndarray:
+    """Return alpha*A + (1-alpha)*B with one alpha per row, redrawn for the rows leaving [lo, hi]."""
+    alpha = rng.uniform(-deviation, 1+deviation, (len(A), 1))
+    C = alpha*A + (1-alpha)*B
+    rows = np.flatnonzero(((C < lo) | (C > hi)).any(axis=1))
+    for _ in range(max_tries):
+        if not len(rows): break
+        alpha = rng.uniform(-deviation, 1+deviation, (len(rows), 1))
+        C[rows] = alpha*A[rows] + (1-alpha)*B[rows]
+        rows = rows[((C[rows] < lo[rows]) | (C[rows] > hi[rows])).any(axis=1)]
+    C[rows] = A[rows]
+    return C
+
@@ -1,9 +1,12 @@
-from typing import Any, Callable, List
+from typing import Any, Callable, List, Tuple
+from bisect import bisect_right
+from itertools import accumulate
+import heapq
 import random
-from miscellaneous import pareto_dominance as p_d
+import numpy as np
+from miscellaneous.miscellaneous import pareto_dominance as p_d
 
-if __name__ == "__main__":
-    Vector = List[Any]
+Vector = List[Any]
 
 ## At random selection methods
     
@@ -30,11 +33,11 @@ def fitness_proportionate_selection(population:List[Vector],
     print(selected_vector)
     """
 
-    if not fit: fit = [fitness(p) for p in population]
+    if fit is None or len(fit) == 0: fit = [fitness(p) for p in population]
     if all(i == 0.0 for i in fit):
         fit = [1 for _ in range(len(fit))]
-    fit = fit[0] + [sum(fit[:i]) for i in range(1,len(fit))]
-    return population[random.randint(0,len(fit)-1)]
+    fit = list(accumulate(fit))
+    return population[min(bisect_right(fit, random.random()*fit[-1]), len(fit)-1)]
 
 def stochasting_universal_sampling(populiation:List[Vector],
                                    fitness:Callable = None,
@@ -59,17 +62,221 @@ def stochasting_universal_sampling(populiation:List[Vector],
         print(selected_vector)
     """
 
-    index = 0
-    if not fit: fit = [fitness(p) for p in populiation]
+    if fit is None or len(fit) == 0: fit = [fitness(p) for p in populiation]
     if all(i == 0.0 for i in fit): fit = [1.0 for _ in range(len(fit))]
-    fit = fit[0] + [sum(fit[:i]) for i in range(1,len(fit))]
-    value = random.randrange(0,fit[-1])
-    while fit[index] < value: index += 1
-    return populiation[index]
+    fit = list(accumulate(fit))
+    return populiation[min(bisect_right(fit, random.random()*fit[-1]), len(fit)-1)]
+
+def batch_stochastic_universal_sampling(fit:np.ndarray,
+                                        k:int,
+                                        rng:np.random.Generator = None,
+                                        shuffle:bool = True
+)-> np.ndarray:
+
+    """
+    Select k individuals at once by stochastic universal sampling.
+
+    The k pointers are evenly spaced over the cumulative fitness, starting from a single random offset,
+    and located with one searchsorted call, so the whole mating pool costs O(n + k log n).
+
+    Parameters:
+    - fit (np.ndarray): The fitness values of the population (non-negative).
+    - k (int): The number of individuals to select.
+    - rng (np.random.Generator, optional): The random generator (default is a fresh one).
+    - shuffle (bool, optional): Whether to shuffle the selected indices, which otherwise come out in
+      population order (default is True).
+
+    Returns:
+    np.ndarray: The k selected indices.
+
+    Example:
+        fit = np.array([calculate_fitness(p) for p in population])
+        mating_pool = [population[i] for i in batch_stochastic_universal_sampling(fit, len(population))]
+    """
+
+    rng = rng or np.random.default_rng()
+    weights = np.asarray(fit, dtype=float)
+    if weights.ndim != 1 or len(weights) == 0: raise ValueError("fit must be a non-empty list of fitness values")
+    if k <= 0: return np.empty(0, dtype=np.intp)
+    if np.any(weights < 0): raise ValueError("stochastic universal sampling needs non-negative fitness values")
+    if not np.any(weights): weights = np.ones_like(weights)
+    cumulative = np.cumsum(weights)
+    step = cumulative[-1] / k
+    pointers = rng.random()*step + step*np.arange(k)
+    indices = np.minimum(np.searchsorted(cumulative, pointers, side="right"), len(cumulative)-1)
+    return rng.permutation(indices) if shuffle else indices
+
+
+class RouletteSampler:
+
+    """
+    A reusable roulette wheel over a fixed list of fitness values, built once per generation.
+
+    With method "alias" the wheel is a Walker alias table built with Vose's algorithm, giving O(1) draws;
+    with method "bisect" it is a cumulative sum searched by bisection, giving O(log n) draws and a cheaper
+    build. When every fitness is 0 the wheel is uniform; negative fitness values are rejected.
+
+    Methods:
+    - draw(): Return one index, drawn with probability proportional to its fitness (uses `random`).
+    - sample(k): Return an array of k indices drawn with replacement in one vectorized call (uses `rng`).
+    - __len__(): Return the number of slots of the wheel.
+
+    Attributes:
+    - method: The sampling method, "alias" or "bisect".
+    - rng: The NumPy random generator used by sample.
+    - total: The sum of the fitness values.
+
+    Example:
+        wheel = RouletteSampler([calculate_fitness(p) for p in population])
+        parents = [population[i] for i in wheel.sample(len(population))]
+    """
+
+    def __init__(self, fit:List[Any], method:str = "alias", rng:np.random.Generator = None):
+        weights = np.asarray(fit, dtype=float)
+        if weights.ndim != 1 or len(weights) == 0: raise ValueError("fit must be a non-empty list of fitness values")
+        if np.any(weights < 0): raise ValueError("fitness proportionate selection needs non-negative fitness values")
+        if not np.any(weights): weights = np.ones_like(weights)
+        self.method = method
+        self.rng = rng or np.random.default_rng()
+        self.total = float(weights.sum())
+        if method == "alias": self._build_alias(weights)
+        elif method == "bisect":
+            self._cumulative = np.cumsum(weights)
+            self._cumulative_list = self._cumulative.tolist()
+        else: raise ValueError(f"Unknown sampling method: {method!r}")
+
+    def draw(self)-> int:
+        if self.method == "alias":
+            i = random.randrange(len(self._probability))
+            return i if random.random() < self._probability_list[i] else self._alias_list[i]
+        return min(bisect_right(self._cumulative_list, random.random()*self.total), len(self._cumulative_list)-1)
+
+    def sample(self, k:int)-> np.ndarray:
+        if self.method == "alias":
+            i = self.rng.integers(len(self._probability), size=k)
+            return np.where(self.rng.random(k) < self._probability[i], i, self._alias[i])
+        indices = np.searchsorted(self._cumulative, self.rng.random(k)*self.total, side="right")
+        return np.minimum(indices, len(self._cumulative)-1)
+
+    def __len__(self)-> int:
+        return len(self._probability) if self.method == "alias" else len(self._cumulative)
+
+    def _build_alias(self, weights:np.ndarray):
+        """Build the probability and alias tables with Vose's algorithm."""
+        n = len(weights)
+        scaled = (weights * (n / self.total)).tolist()
+        probability = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            probability[s] = scaled[s]
+            alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        self._probability = np.array(probability)
+        self._alias = np.array(alias)
+        self._probability_list = probability
+        self._alias_list = alias
 
 
 ## Non random Selection methods
 
+def truncation_selection(fit:np.ndarray,
+                         k:int
+)-> np.ndarray:
+
+    """
+    Select the k fittest individuals with a partial selection instead of a full sort.
+
+    Parameters:
+    - fit (np.ndarray): The fitness values of the population.
+    - k (int): The number of individuals to keep.
+
+    Returns:
+    np.ndarray: The indices of the k fittest individuals, in no particular order.
+
+    Example:
+        survivors = [population[i] for i in truncation_selection(fit, len(population)//10)]
+    """
+
+    fit = np.asarray(fit)
+    if k >= len(fit): return np.arange(len(fit))
+    if k <= 0: return np.empty(0, dtype=np.intp)
+    return np.argpartition(fit, len(fit)-k)[len(fit)-k:]
+
+def rank_selection(fit:np.ndarray,
+                   k:int,
+                   pressure:float = 2.0,
+                   rng:np.random.Generator = None
+)-> np.ndarray:
+
+    """
+    Select k individuals with replacement by linear ranking.
+
+    The rank r (0 for the worst, n-1 for the best) is drawn with probability proportional to
+    (2 - pressure) + 2*(pressure - 1)*r/(n - 1). When only a handful of ranks are drawn (k <= 4) they are
+    located with one argpartition at those positions; beyond that a single argsort is cheaper than
+    partitioning at every drawn rank. The ranks are drawn in O(k) as a mixture of a uniform
+    rank, with probability 2 - pressure, and a rank with probability proportional to r.
+
+    Parameters:
+    - fit (np.ndarray): The fitness values of the population.
+    - k (int): The number of individuals to select.
+    - pressure (float, optional): The selection pressure, between 1 (uniform) and 2 (default is 2.0).
+    - rng (np.random.Generator, optional): The random generator (default is a fresh one).
+
+    Returns:
+    np.ndarray: The k selected indices.
+
+    Example:
+        parents = [population[i] for i in rank_selection(fit, len(population), pressure=1.5)]
+    """
+
+    if not 1.0 <= pressure <= 2.0: raise ValueError("pressure must be between 1 and 2")
+    rng = rng or np.random.default_rng()
+    fit = np.asarray(fit)
+    n = len(fit)
+    if k <= 0: return np.empty(0, dtype=np.intp)
+    ranks = rng.integers(n, size=k)
+    linear = rng.random(k) < pressure - 1.0
+    if n > 1 and linear.any(): ranks[linear] = _linear_ranks(n, int(linear.sum()), rng)
+    if k > 4: return np.argsort(fit)[ranks]
+    return np.argpartition(fit, np.unique(ranks))[ranks]
+
+def _linear_ranks(n:int,
+                  k:int,
+                  rng:np.random.Generator
+)-> np.ndarray:
+    """Draw k ranks in [0, n) with probability proportional to the rank, by inverting the triangular numbers."""
+    u = rng.integers(n*(n-1)//2, size=k)
+    r = np.floor((1 + np.sqrt(1 + 8*u.astype(float))) / 2).astype(np.int64)
+    r -= r*(r-1)//2 > u
+    r += r*(r+1)//2 <= u
+    return r
+
+def elitist_selection(fitted_P:List[Tuple[Any, Any]],
+                      n:int
+)-> List[Tuple[Any, Any]]:
+
+    """
+    Select the n fittest (individual, fitness) pairs of an assessed population.
+
+    Parameters:
+    - fitted_P (List[Tuple[Any, Any]]): The (individual, fitness) pairs returned by assess_fitness.
+    - n (int): The number of elites.
+
+    Returns:
+    List[Tuple[Any, Any]]: The n fittest pairs, best first, found with a bounded heap in O(len * log n).
+
+    Example:
+        elites = [p for p, _ in elitist_selection(assess_fitness(population), 10)]
+    """
+
+    return heapq.nlargest(n, fitted_P, key = lambda x: x[1])
+
+
 def tournament_selection(population:List[Vector],
                          fitness:Callable,
                          t:int = 2
@@ -92,10 +299,12 @@ def tournament_selection(population:List[Vector],
     """
 
     best:Vector = None
+    best_fit = None
     for _ in range(t):
         next_candidate = population[random.randint(0,len(population)-1)]
-        if not best or fitness(next_candidate) > fitness(best):
-            best = next_candidate
+        next_fit = fitness(next_candidate)
+        if best is None or next_fit > best_fit:
+            best, best_fit = next_candidate, next_fit
     return best
 
 def tournament_selection_with_extraction(population:List[Vector],
@@ -106,6 +315,10 @@ def tournament_selection_with_extraction(population:List[Vector],
     """
     Perform tournament selection on a population with extraction.
 
+    The contestants are removed from the population, each in O(1) by swapping it with the last element
+    (so the order of the remaining individuals changes); use batch_tournament_selection with
+    extraction=True to leave the population untouched.
+
     Parameters:
     - population: The list of vectors representing the population.
     - fitness: A function to calculate the fitness value for a vector.
@@ -121,12 +334,54 @@ def tournament_selection_with_extraction(population:List[Vector],
     """
 
     best:Vector = None
+    best_fit = None
     for _ in range(t):
-        next_candidate = population.pop(random.randint(0,len(population)-1))
-        if not best or fitness(next_candidate) > fitness(best):
-            best = next_candidate
+        i = random.randint(0,len(population)-1)
+        population[i], population[-1] = population[-1], population[i]
+        next_candidate = population.pop()
+        next_fit = fitness(next_candidate)
+        if best is None or next_fit > best_fit:
+            best, best_fit = next_candidate, next_fit
     return best
 
+def batch_tournament_selection(fit:np.ndarray,
+                               k:int,
+                               t:int = 2,
+                               rng:np.random.Generator = None,
+                               extraction:bool = False
+)-> np.ndarray:
+
+    """
+    Run k tournaments of size t at once over a precomputed fitness array.
+
+    The contestants are drawn as one (k x t) index matrix and the winners are read off with an argmax
+    along each row, so no fitness function is called. With extraction, no individual takes part in more
+    than one tournament: the matrix is a slice of a single permutation, and the population is not modified.
+
+    Parameters:
+    - fit (np.ndarray): The fitness values of the population.
+    - k (int): The number of tournaments, i.e. of individuals to select.
+    - t (int, optional): The tournament size (number of participants, default is 2).
+    - rng (np.random.Generator, optional): The random generator (default is a fresh one).
+    - extraction (bool, optional): Whether contestants are drawn without replacement across all the
+      tournaments, which needs k*t <= len(fit) (default is False).
+
+    Returns:
+    np.ndarray: The indices of the k winners.
+
+    Example:
+        fit = np.array([calculate_fitness(p) for p in population])
+        parents = [population[i] for i in batch_tournament_selection(fit, len(population), t=3)]
+    """
+
+    rng = rng or np.random.default_rng()
+    fit = np.asarray(fit)
+    if extraction:
+        if k*t > len(fit): raise ValueError("tournaments with extraction need k*t <= population size")
+        contestants = rng.permutation(len(fit))[:k*t].reshape(k, t)
+    else: contestants = rng.integers(len(fit), size=(k, t))
+    return contestants[np.arange(k), np.argmax(fit[contestants], axis=1)]
+
 
 def pareto_dominance_binary_tournament_selection(population:List[Vector],
                                                  objectives:List[Callable]
@@ -1,8 +1,8 @@
 from typing import Any, Callable, List
 import random
+import numpy as np
 
-if __name__ == "__main__":
-    Vector = List[Any]
+Vector = List[Any]
 
 def macro_for_convolution(V:Vector,
                                 p:float,
@@ -36,13 +36,13 @@ def macro_for_convolution(V:Vector,
         print(result_vector)
     """
 
-    toRetV:Vector
+    toRetV:Vector = list(V)
     for index, i in enumerate(V):
         if p > random.random():
-            n = function(-r,r) if sigma != None else function(0,sigma)
+            n = function(-r,r) if sigma == None else function(0,sigma)
             i_temp = tweak(i, n)
             toRetV[index] = i_temp if (i_temp >= min and i_temp <= max) else i
-    return V
+    return toRetV
 
 def bounded_uniform_convolution(V:Vector,
                                 p:float,
@@ -75,7 +75,7 @@ def bounded_uniform_convolution(V:Vector,
 
     """
 
-    return macro_for_convolution(V,p,min, max,tweak, random.random(), r, None)
+    return macro_for_convolution(V,p,min, max,tweak, random.uniform, r, None)
 
 
 def gaussian_convolution(V:Vector, 
@@ -110,5 +110,134 @@ def gaussian_convolution(V:Vector,
     
     """
 
-    return macro_for_convolution(V,p,min, max,tweak, random.gauss(), None, sigma)
+    return macro_for_convolution(V,p,min, max,tweak, random.gauss, None, sigma)
 
+
+
+def batch_convolution(M:np.ndarray,
+                      p:float,
+                      min:Any,
+                      max:Any,
+                      noise:Callable,
+                      bounds:str = "resample",
+                      rng:np.random.Generator = None,
+                      max_tries:int = 100
+)-> np.ndarray:
+
+    """
+    Apply additive convolution noise to a whole population matrix in one call.
+
+    Each gene is mutated with probability p (one boolean mask for the whole matrix); the mutated genes
+    that leave [min, max] are then brought back according to the bounds policy:
+    - "clip": clamp them to the nearest bound.
+    - "reflect": fold them back into the interval, as if it had mirrors at both ends.
+    - "resample": redraw the noise of the out-of-range genes only, until they are in bounds; genes still
+      out of range after max_tries redraws keep their original value, as in macro_for_convolution.
+
+    Parameters:
+    - M (np.ndarray): The population, one individual per row (a single vector is also accepted).
+    - p (float): The probability of mutating each gene.
+    - min (Any): The minimum allowable value, a scalar or one value per gene.
+    - max (Any): The maximum allowable value, a scalar or one value per gene.
+    - noise (Callable): A function mapping (rng, size) to an array of `size` noise values.
+    - bounds (str, optional): The bounds policy, "clip", "reflect" or "resample" (default is "resample").
+    - rng (np.random.Generator, optional): The random generator (default is a fresh one).
+    - max_tries (int, optional): The maximum number of redraws of the "resample" policy (default is 100).
+
+    Returns:
+    np.ndarray: The mutated population, as a new float matrix.
+
+    Example:
+        children = batch_convolution(P.genomes, 0.1, -5.0, 5.0, lambda rng, size: rng.standard_cauchy(size), "reflect")
+    """
+
+    rng = rng or np.random.default_rng()
+    M = np.asarray(M, dtype=float)
+    lo = np.broadcast_to(np.asarray(min, dtype=float), M.shape)
+    hi = np.broadcast_to(np.asarray(max, dtype=float), M.shape)
+    mask = rng.random(M.shape) < p
+    original, lo, hi = M[mask], lo[mask], hi[mask]
+    values = original + noise(rng, len(original))
+    if bounds == "clip": values = np.clip(values, lo, hi)
+    elif bounds == "reflect": values = _reflect(values, lo, hi)
+    elif bounds == "resample":
+        out = np.flatnonzero((values < lo) | (values > hi))
+        for _ in range(max_tries):
+            if not len(out): break
+            values[out] = original[out] + noise(rng, len(out))
+            out = out[(values[out] < lo[out]) | (values[out] > hi[out])]
+        values[out] = original[out]
+    else: raise ValueError(f"Unknown bounds policy: {bounds!r}")
+    R = M.copy()
+    R[mask] = values
+    return R
+
+def batch_bounded_uniform_convolution(M:np.ndarray,
+                                      p:float,
+                                      r:float,
+                                      min:Any,
+                                      max:Any,
+                                      bounds:str = "resample",
+                                      rng:np.random.Generator = None
+)-> np.ndarray:
+
+    """
+    Apply bounded uniform convolution to a whole population matrix in one call.
+
+    Parameters:
+    - M (np.ndarray): The population, one individual per row.
+    - p (float): The probability of mutating each gene.
+    - r (float): The half-width of the uniform noise, drawn in [-r, r].
+    - min (Any): The minimum allowable value, a scalar or one value per gene.
+    - max (Any): The maximum allowable value, a scalar or one value per gene.
+    - bounds (str, optional): The bounds policy, "clip", "reflect" or "resample" (default is "resample").
+    - rng (np.random.Generator, optional): The random generator (default is a fresh one).
+
+    Returns:
+    np.ndarray: The mutated population.
+
+    Example:
+        children = batch_bounded_uniform_convolution(P.genomes, 0.5, 0.1, 0, 10)
+    """
+
+    return batch_convolution(M, p, min, max, lambda rng, size: rng.uniform(-r, r, size), bounds, rng)
+
+def batch_gaussian_convolution(M:np.ndarray,
+                               p:float,
+                               sigma:float,
+                               min:Any,
+                               max:Any,
+                               bounds:str = "resample",
+                               rng:np.random.Generator = None
+)-> np.ndarray:
+
+    """
+    Apply Gaussian convolution to a whole population matrix in one call.
+
+    Parameters:
+    - M (np.ndarray): The population, one individual per row.
+    - p (float): The probability of mutating each gene.
+    - sigma (float): The standard deviation of the Gaussian noise.
+    - min (Any): The minimum allowable value, a scalar or one value per gene.
+    - max (Any): The maximum allowable value, a scalar or one value per gene.
+    - bounds (str, optional): The bounds policy, "clip", "reflect" or "resample" (default is "resample").
+    - rng (np.random.Generator, optional): The random generator (default is a fresh one).
+
+    Returns:
+    np.ndarray: The mutated population.
+
+    Example:
+        children = batch_gaussian_convolution(P.genomes, 1.0, 0.2, 0, 10, bounds="clip")
+    """
+
+    return batch_convolution(M, p, min, max, lambda rng, size: rng.normal(0.0, sigma, size), bounds, rng)
+
+def _reflect(values:np.ndarray,
+             lo:np.ndarray,
+             hi:np.ndarray
+)-> np.ndarray:
+    """Fold values back into [lo, hi] by reflecting them on the bounds as many times as needed."""
+    width = hi - lo
+    folded = np.mod(values - lo, 2*np.where(width > 0, width, 1))
+    folded = np.where(folded > width, 2*width - folded, folded)
+    return np.where(width > 0, lo + folded, lo)
@@ -1,14 +1,75 @@
-from typing import Any, Callable, List
+from typing import Any, Callable, List, Tuple
 import math
-from miscellaneous.miscellaneous import IterableQueue
+import random
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from miscellaneous.miscellaneous import BasinCache, FeatureTabuMemory, TabuList, genome_key
 
 """Single State Methods"""
 
+def _score(S:Any,
+           q_S:Any,
+           R:Any,
+           quality:Callable,
+           delta_quality:Callable = None
+)-> Any:
+    
+    """
+    Return the quality of a candidate, a full state or a move on S under the delta protocol.
+    """
+
+    return quality(R) if delta_quality is None else q_S + delta_quality(S, R)
+
+def _accept(S:Any,
+            R:Any,
+            apply:Callable = None
+)-> Any:
+    
+    """
+    Return the state reached by a candidate, a full state or a move on S under the delta protocol.
+    """
+
+    return R if apply is None else apply(S, R)
+
+def _best_neighbour(S:Any,
+                    q_S:Any,
+                    n:int,
+                    tweak:Callable,
+                    quality:Callable,
+                    maximize:bool = True,
+                    delta_quality:Callable = None,
+                    batch_tweak:Callable = None,
+                    batch_quality:Callable = None
+)-> Tuple[Any, Any]:
+    
+    """
+    Sample n neighbours of S and return the best (candidate, quality) pair.
+    """
+
+    if batch_tweak is not None:
+        candidates = batch_tweak(S, n)
+        if batch_quality is None: qualities = np.asarray([_score(S, q_S, R, quality, delta_quality) for R in candidates])
+        elif delta_quality is None: qualities = np.asarray(batch_quality(candidates))
+        else: qualities = q_S + np.asarray(batch_quality(S, candidates))
+        i = int(np.argmax(qualities) if maximize else np.argmin(qualities))
+        return candidates[i], qualities[i]
+    R = tweak(S)
+    q_R = _score(S, q_S, R, quality, delta_quality)
+    for _ in range(1,n):
+        W = tweak(S)
+        q_W = _score(S, q_S, W, quality, delta_quality)
+        if (q_W > q_R) if maximize else (q_W < q_R): R, q_R = W, q_W
+    return R, q_R
+
 def hill_climbing(S:Any,
                   tweak:Callable,
                   quality:Callable,
                   time:Any,
-                  isIdeal:Callable
+                  isIdeal:Callable,
+                  delta_quality:Callable = None,
+                  apply:Callable = None
 ) -> Any:
     
     """
@@ -20,14 +81,18 @@ def hill_climbing(S:Any,
     - quality (Callable): A function that evaluates the quality of a state.
     - time (Any): The maximum number of iterations or time limit for the algorithm.
     - isIdeal (Callable): A function that checks if a state is ideal.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
 
     Returns:
     Any: The best state found by the hill climbing algorithm.
     """
         
+    q_S = quality(S)
     while not isIdeal(S) or time > 0:
         R = tweak(S)
-        if quality(R) > quality(S): S = R
+        q_R = _score(S, q_S, R, quality, delta_quality)
+        if q_R > q_S: S, q_S = _accept(S, R, apply), q_R
         time -=1
     return S
 
@@ -36,8 +101,11 @@ def steepest_hill_climbing(S:Any,
                            quality:Callable, 
                            isIdeal:Callable, 
                            time:int, 
-                           n:int
-
+                           n:int,
+                           delta_quality:Callable = None,
+                           apply:Callable = None,
+                           batch_tweak:Callable = None,
+                           batch_quality:Callable = None
 )-> Any:
     
     """
@@ -50,17 +118,18 @@ def steepest_hill_climbing(S:Any,
     - isIdeal (Callable): A function that checks if a state is ideal.
     - time (int): The maximum number of iterations or time limit for the algorithm.
     - n (int): The number of iterations for steepest ascent.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - batch_tweak (Callable, optional): If given, batch_tweak(S, n) returns the whole sampled neighbourhood at once (default is None).
+    - batch_quality (Callable, optional): A function scoring the list of candidates in one call, e.g. vectorized or PoolEvaluator(quality).map; called as batch_quality(S, candidates) and returning changes in quality under the delta protocol (default is None, scoring each candidate with quality or delta_quality).
 
     Returns:
     Any: The best state found by the steepest hill climbing algorithm.
     """
+    q_S = quality(S)
     while not isIdeal(S) and time > 0:
-        R = tweak(S)
-        for _ in range(1,n):
-            W = tweak(S)
-            if quality(W) > quality(R): R = W
-            pass
-        if quality(R) > quality(S): S = R
+        R, q_R = _best_neighbour(S, q_S, n, tweak, quality, True, delta_quality, batch_tweak, batch_quality)
+        if q_R > q_S: S, q_S = _accept(S, R, apply), q_R
         time -= 1
     return S
 
@@ -69,7 +138,11 @@ def steepest_hill_falling(S:Any,
                           quality:Callable, 
                           isIdeal:Callable, 
                           time:int, 
-                          n:int
+                          n:int,
+                          delta_quality:Callable = None,
+                          apply:Callable = None,
+                          batch_tweak:Callable = None,
+                          batch_quality:Callable = None
 )-> Any:
     
     """
@@ -82,16 +155,18 @@ def steepest_hill_falling(S:Any,
     - isIdeal (Callable): A function that checks if a state is ideal.
     - time (int): The maximum number of iterations or time limit for the algorithm.
     - n (int): The number of iterations for steepest descent.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - batch_tweak (Callable, optional): If given, batch_tweak(S, n) returns the whole sampled neighbourhood at once (default is None).
+    - batch_quality (Callable, optional): A function scoring the list of candidates in one call, e.g. vectorized or PoolEvaluator(quality).map; called as batch_quality(S, candidates) and returning changes in quality under the delta protocol (default is None, scoring each candidate with quality or delta_quality).
 
     Returns:
     Any: The best state found by the steepest hill falling algorithm.
     """
+    q_S = quality(S)
     while not isIdeal(S) and time > 0:
-        R = tweak(S)
-        for _ in range(1,n):
-            W = tweak(S)
-            if quality(W) < quality(R): R = W
-        if quality(R) < quality(S): S = R
+        R, q_R = _best_neighbour(S, q_S, n, tweak, quality, False, delta_quality, batch_tweak, batch_quality)
+        if q_R < q_S: S, q_S = _accept(S, R, apply), q_R
         time -= 1   
     return S
 
@@ -100,8 +175,11 @@ def steepest_hill_climbing_with_replacement(S:Any,
                                             quality:Callable,
                                             isIdeal:Callable,
                                             time:int,
-                                            n:int
-
+                                            n:int,
+                                            delta_quality:Callable = None,
+                                            apply:Callable = None,
+                                            batch_tweak:Callable = None,
+                                            batch_quality:Callable = None
 )-> Any:
     """
     Steepest Hill Climbing Algorithm with Replacement.
@@ -113,18 +191,20 @@ def steepest_hill_climbing_with_replacement(S:Any,
     - isIdeal (Callable): A function that checks if a state is ideal.
     - time (int): The maximum number of iterations or time limit for the algorithm.
     - n (int): The number of iterations for steepest ascent.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - batch_tweak (Callable, optional): If given, batch_tweak(S, n) returns the whole sampled neighbourhood at once (default is None).
+    - batch_quality (Callable, optional): A function scoring the list of candidates in one call, e.g. vectorized or PoolEvaluator(quality).map; called as batch_quality(S, candidates) and returning changes in quality under the delta protocol (default is None, scoring each candidate with quality or delta_quality).
 
     Returns:
     Any: The best state found by the steepest hill climbing algorithm with replacement.
     """
     best = S
+    q_S = q_best = quality(S)
     while not isIdeal(best) and time > 0:
-        R = tweak(S)
-        for _ in range(1,n):
-            W = tweak(S)
-            if quality(W) > quality(R): R = W
-        S = R
-        if quality(S) > quality(best): best = S
+        R, q_R = _best_neighbour(S, q_S, n, tweak, quality, True, delta_quality, batch_tweak, batch_quality)
+        S, q_S = _accept(S, R, apply), q_R
+        if q_S > q_best: best, q_best = S, q_S
         time -= 1
     return best
 
@@ -133,8 +213,11 @@ def steepest_hill_falling_with_replacement(S:Any,
                                            quality:Callable,
                                            isIdeal:Callable, 
                                            time:int, 
-                                           n:int
-
+                                           n:int,
+                                           delta_quality:Callable = None,
+                                           apply:Callable = None,
+                                           batch_tweak:Callable = None,
+                                           batch_quality:Callable = None
 )-> Any:
     
     """
@@ -147,19 +230,21 @@ def steepest_hill_falling_with_replacement(S:Any,
     - isIdeal (Callable): A function that checks if a state is ideal.
     - time (int): The maximum number of iterations or time limit for the algorithm.
     - n (int): The number of iterations for steepest descent.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - batch_tweak (Callable, optional): If given, batch_tweak(S, n) returns the whole sampled neighbourhood at once (default is None).
+    - batch_quality (Callable, optional): A function scoring the list of candidates in one call, e.g. vectorized or PoolEvaluator(quality).map; called as batch_quality(S, candidates) and returning changes in quality under the delta protocol (default is None, scoring each candidate with quality or delta_quality).
 
     Returns:
     Any: The best state found by the steepest hill falling algorithm with replacement.
     """
 
     best = S
+    q_S = q_best = quality(S)
     while not isIdeal(best) and time > 0:
-        R = tweak(S)
-        for _ in range(1,n):
-            W = tweak(S)
-            if quality(W) < quality(R): R = W
-        S = R
-        if quality(S) < quality(best): best = S
+        R, q_R = _best_neighbour(S, q_S, n, tweak, quality, False, delta_quality, batch_tweak, batch_quality)
+        S, q_S = _accept(S, R, apply), q_R
+        if q_S < q_best: best, q_best = S, q_S
         time -= 1
     return best
 
@@ -197,7 +282,10 @@ def hill_climbing_with_random_restarts(distribution:callable,
                                        tweak:Callable,
                                        quality:Callable,
                                        rand_gen:Callable,
-                                       isIdeal:Callable
+                                       isIdeal:Callable,
+                                       delta_quality:Callable = None,
+                                       apply:Callable = None,
+                                       workers:int = None
 )-> Any:
     """
     Hill Climbing Algorithm with Random Restarts.
@@ -210,21 +298,124 @@ def hill_climbing_with_random_restarts(distribution:callable,
     - quality (Callable): A function that evaluates the quality of a state.
     - rand_gen (Callable): A function that generates a random state.
     - isIdeal (Callable): A function that checks if a state is ideal.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - workers (int, optional): If given, run the restarts as tasks on a pool of this many processes sharing the time budget (default is None).
 
     Returns:
     Any: The best state found by the hill climbing algorithm with random restarts.
     """
+    if workers:
+        return _parallel_restarts(_hill_climbing_restarts_worker, workers, time,
+                                  [(distribution, S if i == 0 else None, tweak, quality, rand_gen, isIdeal, delta_quality, apply)
+                                   for i in range(workers)])
     best = S
+    q_best = quality(best)
     while not isIdeal(best) and time > 0:
         t = distribution()
+        q_S = quality(S)
         while not isIdeal(S) and time >0  and t>0:
             R = tweak(S)
-            if quality(R) > quality(S): S = R
-        if quality(S) > quality(best): best = S 
+            q_R = _score(S, q_S, R, quality, delta_quality)
+            if q_R > q_S: S, q_S = _accept(S, R, apply), q_R
+            t -= 1
+        if q_S > q_best: best, q_best = S, q_S
         S = rand_gen()
         time-=1
     return best
 
+def _hill_climbing_restarts_worker(distribution:Callable,
+                                   S:Any,
+                                   tweak:Callable,
+                                   quality:Callable,
+                                   rand_gen:Callable,
+                                   isIdeal:Callable,
+                                   delta_quality:Callable,
+                                   apply:Callable
+)-> Tuple[Any, Any]:
+    
+    """
+    Run hill climbing restarts while the shared budget lasts and return the worker's (best, quality) pair.
+    """
+
+    if S is None: S = rand_gen()
+    best = S
+    q_best = quality(best)
+    while not isIdeal(best) and _take_restart():
+        t = distribution()
+        q_S = quality(S)
+        while not isIdeal(S) and t>0 and not _restart_state["stop"].value:
+            R = tweak(S)
+            q_R = _score(S, q_S, R, quality, delta_quality)
+            if q_R > q_S: S, q_S = _accept(S, R, apply), q_R
+            t -= 1
+        if q_S > q_best: best, q_best = S, q_S
+        S = rand_gen()
+    _publish_restart(isIdeal(best))
+    return best, q_best
+
+_restart_state = dict()
+
+def _init_restart_worker(budget:Any,
+                         stop:Any
+):
+    
+    """
+    Store the shared restart budget and stop flag in a pool worker.
+    """
+
+    random.seed()
+    _restart_state.update(budget=budget, stop=stop)
+
+def _publish_restart(ideal:bool
+):
+    
+    """
+    Set the shared stop flag if an ideal state was found, so that every worker stops early.
+    """
+
+    if ideal: _restart_state["stop"].value = True
+
+def _restart_stopped(
+)-> bool:
+    
+    """
+    Check the shared stop flag of the restart pool.
+    """
+
+    return bool(_restart_state["stop"].value)
+
+def _take_restart(
+)-> bool:
+    
+    """
+    Consume one restart from the shared budget, if any is left and no worker has reached an ideal state.
+    """
+
+    budget = _restart_state["budget"]
+    with budget.get_lock():
+        if _restart_state["stop"].value or budget.value <= 0: return False
+        budget.value -= 1
+        return True
+
+def _parallel_restarts(worker:Callable,
+                       workers:int,
+                       time:int,
+                       args:List[tuple]
+)-> Any:
+    
+    """
+    Run a restart worker on a process pool sharing the time budget and return the best state found.
+    """
+
+    context = multiprocessing.get_context()
+    budget = context.Value("l", time)
+    stop = context.Value("b", False)
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_restart_worker,
+                             initargs=(budget, stop)) as executor:
+        results = [future.result() for future in [executor.submit(worker, *a) for a in args]]
+    return max(results, key=lambda r: r[1])[0]
+
 
 def simulated_annealing(S:Any,
                         t:int,
@@ -236,6 +427,10 @@ def simulated_annealing(S:Any,
                         isIdeal:Callable,
                         reheatability:bool = False,
                         reheating:Callable = None,
+                        delta_quality:Callable = None,
+                        apply:Callable = None,
+                        batch_size:int = None,
+                        schedule:List[float] = None
 )-> Any:
     
     """
@@ -247,34 +442,258 @@ def simulated_annealing(S:Any,
     - time (int): The maximum number of iterations or time limit for the algorithm.
     - tweak (Callable): A function that tweaks the current state.
     - quality (Callable): A function that evaluates the quality of a state.
-    - P (Callable): A function to calculate the acceptance probability.
+    - P (Callable): A function returning a uniform random number in [0, 1), or a batch of them when batch_size is given.
     - decreasing (Callable): A function to decrease the temperature.
     - isIdeal (Callable): A function that checks if a state is ideal.
     - reheatability (bool): Whether to use reheating (default is False).
     - reheating (Callable): A function to adjust the temperature during reheating.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - batch_size (int, optional): If given, P is called as P(batch_size) and the acceptance numbers are consumed from the batch (default is None).
+    - schedule (List[float], optional): A precomputed table of temperatures, one per step, used instead of t, decreasing and reheating (default is None).
 
     Returns:
     Any: The best state found by the simulated annealing algorithm.
+
+    Example:
+        table = temperature_schedule(100.0, 10000, lambda t: t * 0.999)
+        best = simulated_annealing(S, table[0], 10000, tweak, quality, numpy_rng.random, None, isIdeal,
+                                   batch_size=1024, schedule=table)
     """
 
+    if schedule is not None: t = schedule[0] if len(schedule) else 0
     original_t = t
+    step = 0
+    draws = _uniforms(P, batch_size)
     best = S
+    q_S = q_best = quality(S)
     while not isIdeal(best) and time >0 and t>0:
         R = tweak(S)
-        if quality(R)> quality(S) or P() >= math.e**((quality(R)-quality(S))/t): S= R
-        if reheatability: t = reheating(original_t, t)
+        q_R = _score(S, q_S, R, quality, delta_quality)
+        if q_R > q_S or next(draws) < math.exp((q_R-q_S)/t):
+            S, q_S = _accept(S, R, apply), q_R
+            if q_S > q_best: best, q_best = S, q_S
+        if schedule is not None:
+            step += 1
+            t = schedule[step] if step < len(schedule) else 0
+        elif reheatability: t = reheating(original_t, t)
         else: t = decreasing(t)
-        if quality(S) > quality(best): best = S
         time-=1
     return best
 
+def batched_simulated_annealing(S:np.ndarray,
+                                t:float | np.ndarray,
+                                time:int,
+                                tweak:Callable,
+                                quality:Callable,
+                                decreasing:Callable,
+                                isIdeal:Callable = None,
+                                rng:np.random.Generator = None
+)-> Tuple[np.ndarray, np.ndarray]:
+    
+    """
+    Vectorized Multi-Chain Simulated Annealing Algorithm.
+
+    K independent chains advance in lockstep: each step makes one batched tweak call, one batched
+    quality call and a vectorized Metropolis acceptance over K uniforms.
+
+    Parameters:
+    - S (np.ndarray): The initial states, one chain per row (first axis).
+    - t (float or np.ndarray): Initial temperature, shared or one per chain.
+    - time (int): The maximum number of iterations for the algorithm.
+    - tweak (Callable): A function that tweaks every row of a batch of states.
+    - quality (Callable): A function that evaluates a batch of states into an array of K qualities.
+    - decreasing (Callable): A function to decrease the array of temperatures.
+    - isIdeal (Callable, optional): A function mapping the batch of best states to one flag per chain; the run stops once any chain is ideal (default is None).
+    - rng (np.random.Generator, optional): The random generator of the acceptance numbers (default is a new generator).
+
+    Returns:
+    Tuple[np.ndarray, np.ndarray]: The best state of every chain and their qualities.
+
+    Example:
+        S = rng.permutation(np.tile(np.arange(100), (1024, 1)), axis=1)
+        best, q_best = batched_simulated_annealing(S, 10.0, 100000, batch_swap, batch_tour_quality, lambda t: t * 0.9999)
+        print(best[np.argmax(q_best)])
+    """
+
+    rng = rng or np.random.default_rng()
+    S = np.asarray(S)
+    q_S = np.asarray(quality(S), dtype=float)
+    best, q_best = S.copy(), q_S.copy()
+    t = np.broadcast_to(np.asarray(t, dtype=float), q_S.shape).copy()
+    rows = (-1,) + (1,) * (S.ndim - 1)
+    while time > 0 and np.any(t > 0):
+        R = tweak(S)
+        q_R = np.asarray(quality(R), dtype=float)
+        with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+            accept = (q_R > q_S) | (rng.random(len(q_S)) < np.exp((q_R - q_S) / t))
+        S = np.where(accept.reshape(rows), R, S)
+        q_S = np.where(accept, q_R, q_S)
+        improved = q_S > q_best
+        best[improved] = S[improved]
+        q_best[improved] = q_S[improved]
+        t = decreasing(t)
+        time -= 1
+        if isIdeal is not None and np.any(isIdeal(best)): break
+    return best, q_best
+
+def temperature_schedule(t:float,
+                         time:int,
+                         decreasing:Callable
+)-> List[float]:
+    
+    """
+    Precompute a temperature table for simulated annealing.
+
+    Parameters:
+    - t (float): Initial temperature.
+    - time (int): The number of steps of the table.
+    - decreasing (Callable): A function to decrease the temperature.
+
+    Returns:
+    List[float]: The temperature of every step, starting from t.
+    """
+
+    table = [t]
+    for _ in range(1, time): table.append(decreasing(table[-1]))
+    return table
+
+def _uniforms(P:Callable,
+              batch_size:int = None
+):
+    
+    """
+    Yield acceptance random numbers from P, one call per number or one call per batch.
+    """
+
+    while True:
+        if batch_size: yield from P(batch_size)
+        else: yield P()
+
+def parallel_tempering(S:Any,
+                       temperatures:List[float],
+                       time:int,
+                       swap_interval:int,
+                       tweak:Callable,
+                       quality:Callable,
+                       isIdeal:Callable,
+                       delta_quality:Callable = None,
+                       apply:Callable = None,
+                       seed:int = None
+)-> Any:
+    
+    """
+    Parallel Tempering (Replica-Exchange Simulated Annealing) Algorithm.
+
+    One replica per temperature runs Metropolis steps at a fixed temperature in its own worker process.
+    Every swap_interval steps the replicas report their (state, quality) pair, neighbouring replicas
+    try to exchange states with probability min(1, e^((q_j - q_i)(1/t_i - 1/t_j))) (alternating even
+    and odd pairs), and the states are sent back. Only (state, quality) messages cross process boundaries.
+
+    Parameters:
+    - S (Any): The initial state, shared by all the replicas.
+    - temperatures (List[float]): The temperature ladder, one replica per temperature.
+    - time (int): The number of Metropolis steps run by every replica.
+    - swap_interval (int): The number of steps between two exchange attempts.
+    - tweak (Callable): A picklable function that tweaks the current state.
+    - quality (Callable): A picklable function that evaluates the quality of a state.
+    - isIdeal (Callable): A function that checks if a state is ideal, tested between exchanges.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - seed (int, optional): The seed of the exchange decisions and of the replicas' random generators (default is None).
+
+    Returns:
+    Any: The best state found by any replica.
+
+    Example:
+        best = parallel_tempering(S, [0.1, 0.3, 1.0, 3.0], 100000, 100, tweak, quality, isIdeal)
+    """
+
+    rng = random.Random(seed)
+    context = multiprocessing.get_context()
+    pipes = list()
+    processes = list()
+    try:
+        for t in temperatures:
+            parent, child = context.Pipe()
+            process = context.Process(target=_replica, args=(child, t, tweak, quality, delta_quality, apply, rng.getrandbits(64)))
+            process.start()
+            child.close()
+            pipes.append(parent)
+            processes.append(process)
+        best = S
+        q_best = quality(S)
+        states = [(S, q_best)] * len(temperatures)
+        parity = 0
+        while not isIdeal(best) and time > 0:
+            steps = min(swap_interval, time)
+            for pipe, (R, q_R) in zip(pipes, states): pipe.send((R, q_R, steps))
+            states = list()
+            for i, pipe in enumerate(pipes):
+                try: result, error = pipe.recv()
+                except EOFError: raise RuntimeError(f"Replica {i} exited with code {processes[i].exitcode}")
+                if error is not None: raise RuntimeError(f"Replica {i} failed:\n{error}")
+                R, q_R, W, q_W = result
+                states.append((R, q_R))
+                if q_W > q_best: best, q_best = W, q_W
+            for i in range(parity, len(states) - 1, 2):
+                exponent = (states[i+1][1] - states[i][1]) * (1/temperatures[i] - 1/temperatures[i+1])
+                if exponent >= 0 or rng.random() < math.exp(exponent): states[i], states[i+1] = states[i+1], states[i]
+            parity ^= 1
+            time -= steps
+    finally:
+        for pipe in pipes:
+            try: pipe.send(None)
+            except OSError: pass
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for pipe in pipes: pipe.close()
+    return best
+
+def _replica(conn:Any,
+             t:float,
+             tweak:Callable,
+             quality:Callable,
+             delta_quality:Callable,
+             apply:Callable,
+             seed:int
+):
+    
+    """
+    Run fixed-temperature Metropolis steps on the (state, quality, steps) messages received on conn.
+
+    Each reply is a (result, error) pair; an exception is reported as its traceback instead of leaving the
+    coordinator waiting.
+    """
+
+    random.seed(seed)
+    try:
+        while (message := conn.recv()) is not None:
+            S, q_S, steps = message
+            best, q_best = S, q_S
+            for _ in range(steps):
+                R = tweak(S)
+                q_R = _score(S, q_S, R, quality, delta_quality)
+                if q_R > q_S or random.random() < math.exp((q_R-q_S)/t):
+                    S, q_S = _accept(S, R, apply), q_R
+                    if q_S > q_best: best, q_best = S, q_S
+            conn.send(((S, q_S, best, q_best), None))
+    except EOFError: pass
+    except BaseException: conn.send((None, traceback.format_exc()))
+
 def taboo_search(l:int,
                  n:int,
                  S:Any,
                  tweak:Callable,
                  quality:Callable,
                  isIdeal:Callable,
-                 time:int
+                 time:int,
+                 delta_quality:Callable = None,
+                 apply:Callable = None,
+                 fingerprint:Callable = None
 )-> Any:
     
     """
@@ -288,23 +707,33 @@ def taboo_search(l:int,
     - quality (Callable): A function that evaluates the quality of a state.
     - isIdeal (Callable): A function that checks if a state is ideal.
     - time (int): The maximum number of iterations or time limit for the algorithm.
+    - delta_quality (Callable, optional): If given, tweak returns a move (applied to test taboo membership) and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - fingerprint (Callable, optional): A function mapping a state to the key stored in the taboo list, e.g. a ZobristHasher (default is genome_key).
 
     Returns:
     Any: The best state found by the taboo search algorithm.
     """
 
     best = S
-    L = IterableQueue(l)
+    q_S = q_best = quality(S)
+    L = TabuList(l, fingerprint or genome_key)
     L.put(S)
     while not isIdeal(best) and time >0:
         R = tweak(S)
+        q_R = _score(S, q_S, R, quality, delta_quality)
+        R = _accept(S, R, apply)
+        R_taboo = R in L
         for _ in range(1,n):
             W = tweak(S)
-            if W not in L and (quality(W)>quality(R) or R in L): R=W
-        if R not in L: 
-            S = R
+            q_W = _score(S, q_S, W, quality, delta_quality)
+            W = _accept(S, W, apply)
+            if (q_W>q_R or R_taboo) and W not in L: R, q_R, R_taboo = W, q_W, False
+        if not R_taboo: 
+            S, q_S = R, q_R
             L.put(R)
-        if quality(S) > quality(best): best = S
+        if q_S > q_best: best, q_best = S, q_S
+        time -= 1
     return best
 
 
@@ -314,35 +743,50 @@ def feature_based_taboo_search(l:int,
                                tweak:Callable,
                                quality:Callable,
                                isIdeal:Callable,
-                               time:int
+                               time:int,
+                               delta_quality:Callable = None,
+                               apply:Callable = None,
+                               aspiration:bool = True,
+                               features:int = None
 )->Any:
     
     """
     Feature-Based Taboo Search Algorithm.
 
     Parameters:
-    - l (int): Size of the taboo list.
+    - l (int): Tenure, the number of iterations a step stays taboo.
     - n (int): Number of iterations for each step.
     - S (Any): The initial state.
-    - tweak (Callable): A function that tweaks the current state and returns the state and the step.
+    - tweak (Callable): A function that tweaks the current state, given the taboo memory, and returns the state and the step (a hashable feature).
     - quality (Callable): A function that evaluates the quality of a state.
     - isIdeal (Callable): A function that checks if a state is ideal.
     - time (int): The maximum number of iterations or time limit for the algorithm.
+    - delta_quality (Callable, optional): If given, tweak returns a move and its step and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - aspiration (bool, optional): Whether a taboo step is allowed when it beats the best quality found so far (default is True).
+    - features (int, optional): If given, steps are integers in [0, features) and the memory is an array (default is None).
 
     Returns:
     Any: The best state found by the feature-based taboo search algorithm.
     """
 
     best = S
-    L = IterableQueue()
+    q_S = q_best = quality(S)
+    L = FeatureTabuMemory(l, features)
     while not isIdeal(best) and time > 0:
         R, step_R = tweak(S, L)
+        q_R = _score(S, q_S, R, quality, delta_quality)
+        R_allowed = step_R not in L or (aspiration and q_R > q_best)
         for _ in range(1,n):
             W, step_W = tweak(S, L)
-            if quality(W) > quality(R): R, step_R = W, step_W
-        S = R
-        L.put(step_R)
-        if quality(S) > quality(best): best = S
+            q_W = _score(S, q_S, W, quality, delta_quality)
+            if (q_W > q_R or not R_allowed) and (step_W not in L or (aspiration and q_W > q_best)):
+                R, q_R, step_R, R_allowed = W, q_W, step_W, True
+        if R_allowed:
+            S, q_S = _accept(S, R, apply), q_R
+            L.put(step_R)
+        if q_S > q_best: best, q_best = S, q_S
+        L.tick()
         time -=1
     return best
 
@@ -352,7 +796,9 @@ def ILS(S: Any,
         tweak: Callable,
         isIdeal: Callable,
         perturb: Callable,
-        NHB: Callable
+        NHB: Callable,
+        cache: BasinCache = None,
+        max_strength: int = None
 ) -> Any:
     """
     Iterated Local Search (ILS) Algorithm.
@@ -365,24 +811,74 @@ def ILS(S: Any,
     - isIdeal (Callable): A function that checks if a state is ideal.
     - perturb (Callable): A function that perturbs the current state.
     - NHB (Callable): A function that generates a new starting point for the next iteration.
+    - cache (BasinCache, optional): A cache of the local optima reached from each start state, used to skip repeated descents (default is None).
+    - max_strength (int, optional): If given, perturb is called as perturb(H, strength), the strength growing up to max_strength while the search keeps landing in already visited basins (default is None).
 
     Returns:
     Any: The best state found by the ILS algorithm.
     """
     best = S
+    q_best = quality(best)
+    strength = 1
     while not isIdeal(best) and time > 0:
-        R = tweak(S)
-        S_perturbed = perturb(R)
+        found = cache.lookup(S) if cache is not None else None
+        if found is None:
+            R = tweak(S)
+            if cache is not None: cache.store(S, R)
+        else: R = found[0]
+        strength = _perturbation_strength(cache, R, strength, max_strength)
+        S_perturbed = perturb(R, strength) if max_strength else perturb(R)
         R = NHB(S, S_perturbed)
         
-        if quality(R) > quality(best):
-            best = R
+        q_R = quality(R)
+        if q_R > q_best:
+            best, q_best = R, q_R
         
         S = R
         time -= 1
     
     return best
 
+def _perturbation_strength(cache:BasinCache,
+                           optimum:Any,
+                           strength:int,
+                           max_strength:int = None
+)-> int:
+    
+    """
+    Count a visit to the optimum's basin and return the next perturbation strength.
+    """
+
+    if cache is None or not max_strength: return strength
+    return min(strength + 1, max_strength) if cache.visit(optimum) > 1 else 1
+
+def _ILS_descent(S:Any,
+                 t:int,
+                 quality:Callable,
+                 tweak:Callable,
+                 isIdeal:Callable,
+                 delta_quality:Callable = None,
+                 apply:Callable = None,
+                 cache:BasinCache = None,
+                 stopped:Callable = None
+)-> Tuple[Any, Any]:
+    
+    """
+    Hill climb from S for at most t steps, reusing the cached optimum of S, and return the (state, quality) pair reached.
+    """
+
+    found = cache.lookup(S) if cache is not None else None
+    if found is not None: return found[0], found[1] if found[1] is not None else quality(found[0])
+    start = S
+    q_S = quality(S)
+    while not isIdeal(S) and t >0 and not (stopped and stopped()):
+        R = tweak(S)
+        q_R = _score(S, q_S, R, quality, delta_quality)
+        if q_R > q_S: S, q_S = _accept(S, R, apply), q_R
+        t -= 1
+    if cache is not None: cache.store(start, S, q_S)
+    return S, q_S
+
 
 def ILS_with_Random_Restarts(distribution:Callable,
                              S:Any,
@@ -391,7 +887,12 @@ def ILS_with_Random_Restarts(distribution:Callable,
                              tweak:Callable,
                              isIdeal:Callable,
                              perturb:Callable,
-                             NHB:Callable
+                             NHB:Callable,
+                             delta_quality:Callable = None,
+                             apply:Callable = None,
+                             workers:int = None,
+                             cache:BasinCache = None,
+                             max_strength:int = None
 )-> Any:
     
     """
@@ -406,24 +907,62 @@ def ILS_with_Random_Restarts(distribution:Callable,
     - isIdeal (Callable): A function that checks if a state is ideal.
     - perturb (Callable): A function that perturbs the current state.
     - NHB (Callable): A function that generates a new starting point for the next iteration.
+    - delta_quality (Callable, optional): If given, tweak returns a move and delta_quality(S, move) is its change in quality (default is None).
+    - apply (Callable, optional): A function returning the state reached by applying a move to S, used with delta_quality (default is None).
+    - workers (int, optional): If given, run the restarts as tasks on a pool of this many processes sharing the time budget (default is None).
+    - cache (BasinCache, optional): A cache of the local optima reached from each start state, used to skip repeated descents (default is None); with workers every process uses its own copy.
+    - max_strength (int, optional): If given, perturb is called as perturb(H, strength), the strength growing up to max_strength while the search keeps landing in already visited basins (default is None).
 
     Returns:
     Any: The best state found by the ILS algorithm with random restarts.
     """
 
+    if workers:
+        return _parallel_restarts(_ILS_restarts_worker, workers, time,
+                                  [(distribution, S, quality, tweak, isIdeal, perturb, NHB, delta_quality, apply, cache, max_strength)
+                                   for _ in range(workers)])
     H = S
     best = S
+    q_best = quality(best)
+    strength = 1
     while not isIdeal(best) and time >0:
-        t = distribution()
-        while isIdeal(S) and t >0 and time >0:
-            R = tweak(S)
-            if quality(R) > quality(S): S = R
-            t -= 1
-        if quality(S) > quality(best): best = S
+        S, q_S = _ILS_descent(S, distribution(), quality, tweak, isIdeal, delta_quality, apply, cache)
+        if q_S > q_best: best, q_best = S, q_S
+        strength = _perturbation_strength(cache, S, strength, max_strength)
         H = NHB(H,S)
-        S = perturb(H)
+        S = perturb(H, strength) if max_strength else perturb(H)
         time -= 1
-    pass
+    return best
+
+def _ILS_restarts_worker(distribution:Callable,
+                         S:Any,
+                         quality:Callable,
+                         tweak:Callable,
+                         isIdeal:Callable,
+                         perturb:Callable,
+                         NHB:Callable,
+                         delta_quality:Callable,
+                         apply:Callable,
+                         cache:BasinCache = None,
+                         max_strength:int = None
+)-> Tuple[Any, Any]:
+    
+    """
+    Run ILS restarts from a worker's own home base while the shared budget lasts and return its (best, quality) pair.
+    """
+
+    H = S
+    best = S
+    q_best = quality(best)
+    strength = 1
+    while not isIdeal(best) and _take_restart():
+        S, q_S = _ILS_descent(S, distribution(), quality, tweak, isIdeal, delta_quality, apply, cache, _restart_stopped)
+        if q_S > q_best: best, q_best = S, q_S
+        strength = _perturbation_strength(cache, S, strength, max_strength)
+        H = NHB(H,S)
+        S = perturb(H, strength) if max_strength else perturb(H)
+    _publish_restart(isIdeal(best))
+    return best, q_best
 
 
 def VNS(S:Any,
@@ -431,7 +970,9 @@ def VNS(S:Any,
         stopCondition:Callable,
         random_solution:Callable,
         local_search:Callable,
-        quality:Callable
+        quality:Callable,
+        workers:int = None,
+        samples:int = 1
 ):
     
     """
@@ -444,6 +985,8 @@ def VNS(S:Any,
     - random_solution: A function to generate a random solution within a given neighbourhood.
     - local_search: A local search algorithm to improve the solution.
     - quality: A function to evaluate the quality of a solution.
+    - workers: If given, shake and run local_search on a pool of this many processes, several neighbourhoods at once (default is None).
+    - samples: The number of shakes of each neighbourhood evaluated together in parallel mode (default is 1).
 
     Returns:
     Any: The best solution found by the VNS algorithm.
@@ -453,16 +996,23 @@ def VNS(S:Any,
     print(best_solution)
     """
 
-    while not stopCondition():
-        index = 1
-        while index < len(neighbourhoods):
-            T = random_solution(neighbourhoods[index], S)
-            W = local_search(T)
-            if quality(W) >quality(S):
-                S = W
-                index = 1
-            else:
-                index += 1
+    executor = ProcessPoolExecutor(workers) if workers else None
+    width = max(1, workers // samples) if workers else 1
+    try:
+        q_S = quality(S)
+        while not stopCondition():
+            index = 1
+            while index < len(neighbourhoods):
+                window = neighbourhoods[index:index + width]
+                W, q_W = next(((W, q_W) for W, q_W in _shake(executor, window, samples, S, random_solution, local_search, quality)
+                               if q_W >q_S), (None, None))
+                if W is not None:
+                    S, q_S = W, q_W
+                    index = 1
+                else:
+                    index += len(window)
+    finally:
+        if executor: executor.shutdown(cancel_futures=True)
     return S
 
 def skewed_VNS(S:Any,
@@ -472,7 +1022,9 @@ def skewed_VNS(S:Any,
                local_search:Callable,
                quality:Callable,
                alpha:float,
-               dist:Callable
+               dist:Callable,
+               workers:int = None,
+               samples:int = 1
 )->Any:
     
     """
@@ -487,6 +1039,8 @@ def skewed_VNS(S:Any,
     - quality: A function to evaluate the quality of a solution.
     - alpha: A parameter controlling the skewness.
     - dist: A function to calculate the distance between two solutions.
+    - workers: If given, shake and run local_search on a pool of this many processes, several neighbourhoods at once (default is None).
+    - samples: The number of shakes of each neighbourhood evaluated together in parallel mode (default is 1).
 
     Returns:
     Any: The best solution found by the Skewed VNS algorithm.
@@ -496,14 +1050,61 @@ def skewed_VNS(S:Any,
     print(best_solution)
     """
     
-    while not stopCondition():
-        index = 1
-        while index < len(neighbourhoods):
-            T = random_solution(neighbourhoods[index], S)
-            W = local_search(T)
-            if quality(W) >quality(S) -alpha*dist(W,S):
-                S = W
-                index = 1
-            else:
-                index += 1
-    return S
\ No newline at end of file
+    executor = ProcessPoolExecutor(workers) if workers else None
+    width = max(1, workers // samples) if workers else 1
+    try:
+        q_S = quality(S)
+        while not stopCondition():
+            index = 1
+            while index < len(neighbourhoods):
+                window = neighbourhoods[index:index + width]
+                W, q_W = next(((W, q_W) for W, q_W in _shake(executor, window, samples, S, random_solution, local_search, quality)
+                               if q_W >q_S -alpha*dist(W,S)), (None, None))
+                if W is not None:
+                    S, q_S = W, q_W
+                    index = 1
+                else:
+                    index += len(window)
+    finally:
+        if executor: executor.shutdown(cancel_futures=True)
+    return S
+
+def _shake(executor:ProcessPoolExecutor,
+           window:List[Any],
+           samples:int,
+           S:Any,
+           random_solution:Callable,
+           local_search:Callable,
+           quality:Callable
+):
+    
+    """
+    Yield the (solution, quality) pairs of shaking S in each neighbourhood of the window, in order.
+
+    Serially each shake is run only when the previous one has been rejected; on a pool every shake is
+    submitted at once and the pending ones are cancelled as soon as one is accepted.
+    """
+
+    tasks = [neighbourhood for neighbourhood in window for _ in range(samples if executor else 1)]
+    if executor is None:
+        for neighbourhood in tasks: yield _shake_and_search(random_solution, local_search, quality, neighbourhood, S)
+        return
+    futures = [executor.submit(_shake_and_search, random_solution, local_search, quality, neighbourhood, S) for neighbourhood in tasks]
+    try:
+        for future in futures: yield future.result()
+    finally:
+        for future in futures: future.cancel()
+
+def _shake_and_search(random_solution:Callable,
+                      local_search:Callable,
+                      quality:Callable,
+                      neighbourhood:Any,
+                      S:Any
+)-> Tuple[Any, Any]:
+    
+    """
+    Shake S in a neighbourhood, run the local search from there and return the (solution, quality) pair.
+    """
+
+    W = local_search(random_solution(neighbourhood, S))
+    return W, quality(W)
\ No newline at end of file